@@ -0,0 +1,52 @@
+# src/browser_server.py
+"""
+Navegador persistente para el spider de LinkedIn.
+
+    python browser_server.py
+
+Deja un Chromium con perfil propio (LINKEDIN_USER_DATA_DIR) escuchando CDP en
+LINKEDIN_CDP_PORT. Con LINKEDIN_CDP_URL=http://localhost:<puerto> el spider se conecta
+a él: no relanza el navegador ni restaura cookies ni repite el login en cada corrida.
+Si el perfil todavía no tiene sesión, se importan las cookies de state.json (si existe);
+si no, el login queda a cargo de la primera corrida del spider.
+"""
+import json
+import time
+
+from playwright.sync_api import sync_playwright
+
+from utils import config
+
+
+def main():
+    port = config.LINKEDIN_CDP_PORT
+    with sync_playwright() as p:
+        context = p.chromium.launch_persistent_context(
+            config.LINKEDIN_USER_DATA_DIR,
+            headless=False,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                "--no-sandbox",
+                f"--remote-debugging-port={port}",
+            ],
+        )
+        try:
+            if not any(c["name"] == "li_at" for c in context.cookies("https://www.linkedin.com")):
+                try:
+                    with open("state.json", "r", encoding="utf-8") as f:
+                        context.add_cookies(json.load(f).get("cookies") or [])
+                except (OSError, ValueError):
+                    pass
+
+            print(f"Navegador listo en http://localhost:{port} (perfil: {config.LINKEDIN_USER_DATA_DIR})")
+            print("Ctrl+C para cerrar.")
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            context.close()
+
+
+if __name__ == "__main__":
+    main()
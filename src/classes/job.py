@@ -1,9 +1,80 @@
+import re
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from bs4 import BeautifulSoup
+from utils.html_parse import parse_detail
+from utils import rules
 from utils.enums import Position, Website, Modality, JobType
 
+# /jobs/view/<slug>-1234567890 o /jobs/view/1234567890
+_LINKEDIN_ID_RE = re.compile(r"(\d{6,})/?$")
+
+# workplaceTypes de la API voyager: urn:li:fs_workplaceType:{1,2,3}
+_LINKEDIN_WORKPLACE = {"1": Modality.PRESENCIAL, "2": Modality.REMOTO, "3": Modality.HIBRIDO}
+
+
+def linkedin_job_id(url: Optional[str]) -> Optional[str]:
+    match = _LINKEDIN_ID_RE.search((url or "").split("?")[0])
+    return match.group(1) if match else None
+
+
+# Orden fijo de campos: define los slots, el documento de Mongo y las filas del CSV
+JOB_FIELDS = (
+    "title",
+    "company",
+    "url",
+    "published_at",
+    "position",
+    "positions",
+    "website",
+    "modality",
+    "location",
+    "description",
+    "salary",
+    "type_",
+    "remote",
+    "source_id",
+    "isPractice",
+    "pending",
+)
+
+CSV_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "position",
+    "website",
+    "type_",
+    "modality",
+    "salary",
+    "remote",
+    "isPractice",
+    "published_at",
+    "url",
+    "description",
+)
+
+_all_fields = attrgetter(*JOB_FIELDS)
+_csv_fields = attrgetter(*CSV_FIELDS)
+
+
+def to_scalar(v: Any) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, Enum):
+        return v.value
+    if isinstance(v, datetime):
+        # ISO 8601; evita problemas de comas/separadores en CSV
+        return v.isoformat(timespec="seconds")
+    return str(v)
+
+
 class Job:
+    # Sin __dict__ por instancia: en corridas grandes se juntan miles de Job
+    __slots__ = JOB_FIELDS
+
     def __init__(
         self,
         title: str,
@@ -18,12 +89,15 @@ class Job:
         salary: Optional[str] = None,
         type_: Optional[JobType] = None,
         remote: Optional[bool] = None,
+        source_id: Optional[str] = None,
     ):
         self.title = title
         self.company = company
         self.url = url
         self.published_at = published_at
         self.position = position
+        # Todas las posiciones bajo las que apareció la oferta (position es la principal)
+        self.positions: Tuple[Position, ...] = (position,)
         self.website = website
         self.modality = modality
         self.location = location
@@ -31,29 +105,61 @@ class Job:
         self.salary = salary
         self.type_ = type_
         self.remote = remote
-
-    def to_dict(self):
-        return self.__dict__
+        self.source_id = source_id
+        self.isPractice: Optional[bool] = None
+        # Campos que el listado no trajo y esperan el detalle (vacío = job completo)
+        self.pending: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(JOB_FIELDS, _all_fields(self)))
+
+    def to_document(self) -> Dict[str, Any]:
+        """Documento para Mongo: enums como su valor, fechas tal cual (BSON las codifica)."""
+        doc = {
+            field: value.value if isinstance(value, Enum) else value
+            for field, value in zip(JOB_FIELDS, _all_fields(self))
+        }
+        doc["positions"] = [p.value for p in self.positions]
+        return doc
+
+    def to_row(self, fields: Sequence[str] = CSV_FIELDS) -> List[str]:
+        """Fila de CSV en el orden de `fields` (CSV_FIELDS por defecto)."""
+        values = _csv_fields(self) if fields is CSV_FIELDS else (getattr(self, f) for f in fields)
+        return [to_scalar(v) for v in values]
+
+    def set_positions(self, positions: Sequence[Position]):
+        """La misma oferta hallada bajo varias posiciones: la primera queda como principal."""
+        self.positions = tuple(positions) or (self.position,)
+        self.position = self.positions[0]
+
+    @property
+    def hydrated(self) -> bool:
+        return not self.pending
+
+    def mark_pending(self, *fields: str):
+        """Job armado desde un listado: `fields` quedan en None hasta que llegue el detalle."""
+        for field in fields:
+            setattr(self, field, None)
+        self.pending = tuple(fields)
+
+    @property
+    def job_id(self) -> str:
+        """
+        ID canónico y compacto: "<sitio>:<id nativo>" (p. ej. "linkedin:4012345678").
+        Si el sitio no entregó ID se usa la URL, que igual es estable.
+        """
+        return f"{self.website.value}:{self.source_id or self.url}"
 
 
     def set_practice(self):
         if not self.title:
             return
-
-        normalized = (
-            self.title.lower()
-            .replace("á", "a")
-            .replace("é", "e")
-            .replace("í", "i")
-            .replace("ó", "o")
-            .replace("ú", "u")
-        )
-
-        words = normalized.split()
-        self.isPractice = any(word in {"practica", "practicas", "practicante"} for word in words)
+        self.isPractice = rules.is_practice(self.title)
 
 
     def set_laborum_data(self, data: dict):
+        if data.get("id") is not None:
+            self.source_id = str(data["id"])
         self.title = data.get("titulo")
         self.company = data.get("empresa")
         self.location = data.get("localizacion")
@@ -79,9 +185,11 @@ class Job:
 
 
     def set_trabajando_data(self, data: dict):
+        if data.get("idOferta") is not None:
+            self.source_id = str(data["idOferta"])
         self.title = data.get("nombreCargo")
         self.company = data.get("nombreEmpresaFantasia")
-        self.location = data.get("ubicacion", {}).get("direccion")
+        self.location = (data.get("ubicacion") or {}).get("direccion")
         self.description = f"{data.get('descripcionOferta')}\n{data.get('requisitosMinimos')}"
 
         self.published_at = datetime.strptime(data.get("fechaPublicacionFormatoIngles", "2000-01-01"), "%Y-%m-%d")
@@ -105,8 +213,10 @@ class Job:
 
 
     def set_trabajo_con_sentido_data(self, data: dict):
+        if data.get("slug"):
+            self.source_id = data["slug"]
         self.title = data.get("title")
-        self.company = data.get("organization", {}).get("name")
+        self.company = (data.get("organization") or {}).get("name")
         self.location = data.get("city")
         self.description = data.get("description")
 
@@ -128,11 +238,14 @@ class Job:
         self.set_practice()
 
 
-    def set_linkedin_html(self, html: str, date: datetime, modality: Modality):
+    def set_linkedin_html(self, html: str, date: datetime, modality: Modality, soup: Optional[BeautifulSoup] = None):
         self.published_at = date
         self.modality = modality
+        self.source_id = linkedin_job_id(self.url) or self.source_id
 
-        soup = BeautifulSoup(html, "html.parser")
+        # Quien ya parseó la página (UI) pasa su soup para no parsear dos veces
+        if soup is None:
+            soup = parse_detail(html)
 
         # Título, empresa, ubicación
         title_el = soup.select_one(".top-card-layout__title")
@@ -147,8 +260,7 @@ class Job:
         
         items = soup.select(".description__job-criteria-text.description__job-criteria-text--criteria")
         if len(items) > 1:
-            type_text = items[1].get_text(strip=True)
-            self.type_ = JobType.PARTTIME if type_text in {"Media jornada", "Voluntario"} else JobType.FULLTIME
+            self.type_ = rules.job_type(items[1].get_text(" ", strip=True)) or JobType.FULLTIME
 
         # Mantener HTML en la descripción 
         desc_tag = soup.select_one(".description__text--rich .show-more-less-html__markup")
@@ -157,3 +269,22 @@ class Job:
         self.set_practice()
 
 
+    def set_linkedin_data(self, data: dict, modality: Optional[Modality] = None):
+        """
+        Datos capturados de la API voyager (ver spiders/api/linkedin_voyager.py).
+        """
+        self.source_id = data.get("id") or self.source_id
+        self.title = data.get("title")
+        self.company = data.get("company")
+        self.location = data.get("location")
+        self.description = data.get("description")
+
+        if data.get("listedAt"):
+            self.published_at = datetime.utcfromtimestamp(data["listedAt"] / 1000)
+
+        self.type_ = rules.job_type(str(data.get("employmentStatus") or "")) or JobType.FULLTIME
+
+        workplace = [str(w)[-1:] for w in data.get("workplaceTypes") or ()]
+        self.modality = next((_LINKEDIN_WORKPLACE[w] for w in workplace if w in _LINKEDIN_WORKPLACE), modality)
+
+        self.set_practice()
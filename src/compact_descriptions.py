@@ -0,0 +1,11 @@
+from services.description_service import compact_existing
+from services.job_service import collection
+
+
+def main():
+    # Migra descripciones en línea (documentos previos) a la colección descriptions
+    print(f"Descripciones migradas: {compact_existing(collection)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from services.dedup_service import rebuild_clusters
+from services.job_service import collection
+
+
+def main():
+    # Batch completo: firmas faltantes + clusters de duplicados sobre toda la colección
+    signed, updated = rebuild_clusters(collection)
+    print(f"Firmas calculadas: {signed}; cluster_id actualizados: {updated}")
+
+
+if __name__ == "__main__":
+    main()
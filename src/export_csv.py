@@ -2,14 +2,24 @@ from __future__ import annotations
 
 import os
 import csv
+import json
 from datetime import datetime
-from typing import List, Dict, Any
-from enum import Enum
+from typing import List, Dict, Any, Iterable, Optional
 
+from classes.job import Job, CSV_FIELDS, to_scalar
 from spiders.api.linkedin import LinkedInSpider
 from spiders.api.laborum import LaborumSpider
 from spiders.api.trabajando import TrabajandoSpider
 from spiders.api.trabajoconsentido import TrabajoConSentidoSpider
+from utils.session import close_sessions
+from utils.crawl_state import crawl_state
+from utils.seen_index import seen_index
+from utils.http_cache import http_cache
+from utils.request_memo import request_memo
+from utils import config
+from utils.env import env_date, env_list
+from utils.filters import ensure_indexes
+from services.export_service import PartitionedExport, check_format
 
 SPIDER_REGISTRY = {
     "linkedin": LinkedInSpider,
@@ -18,50 +28,37 @@ SPIDER_REGISTRY = {
     "trabajoconsentido": TrabajoConSentidoSpider,
 }
 
-CSV_FIELDS = [
-    "title",
-    "company",
-    "location",
-    "position",
-    "website",
-    "type_",
-    "modality",
-    "salary",
-    "remote",
-    "isPractice",
-    "published_at",
-    "url",
-    "description",
-]
-
-def to_scalar(v: Any) -> str:
-    if v is None:
-        return ""
-    if isinstance(v, Enum):
-        return v.value
-    if isinstance(v, datetime):
-        # ISO 8601; evita problemas de comas/separadores en CSV
-        return v.isoformat(timespec="seconds")
-    return str(v)
-
-def job_to_row(job) -> Dict[str, str]:
-    d: Dict[str, Any] = job.to_dict() if hasattr(job, "to_dict") else job.__dict__
-    row = {}
-    for f in CSV_FIELDS:
-        row[f] = to_scalar(d.get(f))
-    return row
+def job_to_row(job: Job) -> List[str]:
+    return job.to_row(CSV_FIELDS)
+
+def doc_to_row(doc: Dict[str, Any]) -> List[str]:
+    return [to_scalar(doc.get(f)) for f in CSV_FIELDS]
+
+def load_last_export() -> Optional[datetime]:
+    try:
+        with open(config.EXPORT_STATE_PATH, "r", encoding="utf-8") as f:
+            return datetime.fromisoformat(json.load(f)["last_first_seen_at"])
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+def save_last_export(ts: datetime):
+    tmp = f"{config.EXPORT_STATE_PATH}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"last_first_seen_at": ts.isoformat()}, f)
+    os.replace(tmp, config.EXPORT_STATE_PATH)
 
 def run_spider(name: str) -> List:
     cls = SPIDER_REGISTRY[name]
     spider = cls()
-    return spider.run() or []
+    try:
+        return list(spider.run())
+    finally:
+        request_memo.clear()
 
-def main():
-    # SPIDERS=linkedin,laborum,trabajando,trabajoconsentido
-    spiders_env = os.getenv("SPIDERS", "linkedin,laborum,trabajando,trabajoconsentido")
-    spider_names = [s.strip().lower() for s in spiders_env.split(",") if s.strip()]
-    csv_path = os.getenv("CSV_PATH", "jobs_export.csv")
-    dedup = os.getenv("DEDUP", "1").lower() in ("1", "true", "yes")
+def jobs_from_spiders(spider_names: List[str], dedup: bool) -> List[Job]:
+    # El CSV debe traer todo, no solo lo nuevo desde la última corrida de index.py
+    crawl_state.enabled = False
+    seen_index.enabled = False
 
     all_jobs: List = []
     for name in spider_names:
@@ -74,6 +71,8 @@ def main():
             all_jobs.extend(jobs)
         except Exception as e:
             print(f"{name}: error -> {e}")
+    close_sessions()
+    http_cache.close()
 
     if dedup:
         uniq: Dict[str, Any] = {}
@@ -83,15 +82,95 @@ def main():
                 uniq[key] = j
         all_jobs = list(uniq.values())
 
-    rows = [job_to_row(j) for j in all_jobs]
+    return all_jobs
+
+class MongoExport:
+    """
+    Filas leídas en streaming desde jobs_db.jobs (sin volver a crawlear).
+    Filtros por env: EXPORT_WEBSITES, EXPORT_POSITIONS, EXPORT_SINCE / EXPORT_UNTIL
+    (published_at, ISO) y EXPORT_INCREMENTAL=1 (solo lo visto después del último export).
+    """
+
+    def __init__(self, incremental: bool):
+        self.incremental = incremental
+        self.last_seen: Optional[datetime] = load_last_export() if incremental else None
+
+    def docs(self, fields: Iterable[str] = CSV_FIELDS) -> Iterable[Dict[str, Any]]:
+        # Import diferido: el modo "spiders" no necesita resolver la URI de Mongo
+        from services.job_service import collection, find_jobs
 
+        ensure_indexes(collection)
+        cursor = find_jobs(
+            list(fields) + ["first_seen_at"],
+            websites=env_list("EXPORT_WEBSITES"),
+            positions=env_list("EXPORT_POSITIONS"),
+            since=env_date("EXPORT_SINCE"),
+            until=env_date("EXPORT_UNTIL"),
+            seen_after=self.last_seen,
+        )
+        try:
+            for doc in cursor:
+                seen = doc.get("first_seen_at")
+                if seen is not None and (self.last_seen is None or seen > self.last_seen):
+                    self.last_seen = seen
+                yield doc
+        finally:
+            cursor.close()
+
+    def commit(self):
+        if self.incremental and self.last_seen is not None:
+            save_last_export(self.last_seen)
+
+def write_csv(csv_path: str, rows: Iterable[List[str]], append: bool) -> int:
     os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
-    with open(csv_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(rows)
+    count = 0
+    with open(csv_path, "a" if append else "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(CSV_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def main():
+    # EXPORT_SOURCE=mongo lee lo ya guardado; "spiders" vuelve a correr los spiders
+    source = os.getenv("EXPORT_SOURCE", "spiders").strip().lower()
+    # EXPORT_FORMAT=csv | ndjson (gzip) | parquet; los dos últimos van particionados en EXPORT_DIR
+    fmt = os.getenv("EXPORT_FORMAT", "csv").strip().lower()
+    csv_path = os.getenv("CSV_PATH", "jobs_export.csv")
+    incremental = os.getenv("EXPORT_INCREMENTAL", "0").lower() in ("1", "true", "yes")
+    if fmt != "csv":
+        check_format(fmt)
+
+    export: Optional[MongoExport] = None
+    if source == "mongo":
+        export = MongoExport(incremental)
+        docs: Iterable[Dict[str, Any]] = export.docs()
+        rows: Iterable[List[str]] = (doc_to_row(d) for d in docs)
+    else:
+        # SPIDERS=linkedin,laborum,trabajando,trabajoconsentido
+        spiders_env = os.getenv("SPIDERS", "linkedin,laborum,trabajando,trabajoconsentido")
+        spider_names = [s.strip().lower() for s in spiders_env.split(",") if s.strip()]
+        dedup = os.getenv("DEDUP", "1").lower() in ("1", "true", "yes")
+        jobs = jobs_from_spiders(spider_names, dedup)
+        docs = (j.to_document() for j in jobs)
+        rows = (job_to_row(j) for j in jobs)
+
+    if fmt == "csv":
+        # Incremental: se agregan filas al mismo CSV
+        append = incremental and export is not None and os.path.exists(csv_path)
+        count = write_csv(csv_path, rows, append)
+        target = csv_path
+    else:
+        target = os.getenv("EXPORT_DIR", config.EXPORT_DIR)
+        writer = PartitionedExport(target, fmt, CSV_FIELDS)
+        count = writer.write_all(docs)
+        writer.close()
 
-    print(f"CSV: {csv_path} ({len(rows)} filas)")
+    if export is not None:
+        export.commit()
+    print(f"{fmt.upper()}: {target} ({count} filas)")
 
 if __name__ == "__main__":
     main()
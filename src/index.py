@@ -1,18 +1,45 @@
-from services.job_service import save_many_jobs
+from services.job_service import save_jobs_stream
 from spiders.api.laborum import LaborumSpider
 from spiders.api.trabajando import TrabajandoSpider
 from spiders.api.trabajoconsentido import TrabajoConSentidoSpider
 from spiders.api.linkedin import LinkedInSpider
+from utils.session import close_sessions
+from utils.throttle import throttle
+from utils.crawl_state import crawl_state
+from utils.seen_index import seen_index
+from utils.http_cache import http_cache
+from utils.request_memo import request_memo
 
 
 def run_spider(spider, name: str):
     print(f"Running {name}")
-    jobs = spider.run()
-    save_many_jobs(jobs)
-    print(f"Finished {name} ({len(jobs)} jobs)")
+    blocked_before = throttle.open_sites()
+    try:
+        total = save_jobs_stream(seen_index.track(spider.run()))
+    except Exception:
+        crawl_state.rollback()
+        seen_index.rollback()
+        raise
+    finally:
+        # El memo es por corrida de spider: no se arrastran respuestas al siguiente sitio
+        memo_hits = request_memo.hits
+        request_memo.clear()
+    # Lo guardado sí quedó guardado: el índice de vistas se confirma igual
+    seen_index.commit()
+    blocked = throttle.open_sites() - blocked_before
+    if blocked:
+        # Con el circuito abierto los fetches devolvieron None: el crawl quedó incompleto y
+        # avanzar los high-water marks (y last_run) saltaría para siempre lo no visto
+        crawl_state.rollback()
+        print(f"{name}: circuit open for {', '.join(sorted(blocked))}, crawl state not advanced")
+    else:
+        for site, failed in crawl_state.commit().items():
+            print(f"{name}: {failed} listing pages of {site} failed, crawl state not advanced")
+    print(f"Finished {name} ({total} jobs, {memo_hits} duplicate requests coalesced)")
 
 def run_all_spiders():
     print("Starting scraping")
+    throttle.reset()
     try:
         
         run_spider(LinkedInSpider(), "LinkedIn")
@@ -22,6 +49,10 @@ def run_all_spiders():
         print("Finished scraping")
     except Exception as e:
         print("Error:", e)
+    finally:
+        close_sessions()
+        seen_index.close()
+        http_cache.close()
 
 if __name__ == "__main__":
     # Ejecuta una vez y termina
@@ -0,0 +1,15 @@
+import os
+
+from services.job_service import reclassify_jobs
+
+
+def main():
+    # WEBSITE=linkedin limita a un sitio; vacío = todo lo guardado
+    website = os.getenv("WEBSITE", "").strip().lower()
+    query = {"website": website} if website else None
+    changed = reclassify_jobs(query)
+    print(f"Reclasificadas: {changed} ofertas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+from services.job_service import collection
+from services.search_service import reindex, search
+from utils.env import env_date, env_list
+
+
+def main():
+    # python search.py python remoto valparaiso
+    # Filtros: SEARCH_WEBSITES, SEARCH_POSITIONS, SEARCH_MODALITIES, SEARCH_SINCE / SEARCH_UNTIL
+    args = sys.argv[1:]
+    if args == ["--reindex"]:
+        print(f"Indexadas: {reindex(collection)} ofertas")
+        return
+
+    started = time.perf_counter()
+    results = search(
+        collection,
+        " ".join(args),
+        websites=env_list("SEARCH_WEBSITES"),
+        positions=env_list("SEARCH_POSITIONS"),
+        modalities=env_list("SEARCH_MODALITIES"),
+        since=env_date("SEARCH_SINCE"),
+        until=env_date("SEARCH_UNTIL"),
+        limit=int(os.getenv("SEARCH_LIMIT", "20")),
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for r in results:
+        published = r.get("published_at")
+        date = published.strftime("%Y-%m-%d") if published else "-"
+        print(f"[{r['score']}] {date} {r.get('website')} | {r.get('title')} - {r.get('company')} ({r.get('location')})")
+        print(f"    {r.get('url')}")
+    print(f"{len(results)} resultados en {elapsed:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from utils import config
+from utils.minhash import MinHasher, job_shingles
+from services import description_service
+
+hasher = MinHasher(num_perm=config.DEDUP_NUM_PERM, bands=config.DEDUP_BANDS)
+
+_SIG_FIELDS = {"title": 1, "company": 1, "description": 1, "description_hash": 1, "minhash": 1}
+# En un bucket grande cada oferta se compara solo con las últimas N sin pareja
+# (ventana móvil): el costo es lineal en el tamaño del bucket y lo nuevo también se compara
+_MAX_PIVOTS = 8
+
+_indexed = False
+
+
+def ensure_index(collection):
+    global _indexed
+    if not _indexed:
+        # Multikey: una entrada por banda; buscar candidatas es un lookup, no un scan
+        collection.create_index("lsh_bands")
+        collection.create_index("cluster_id")
+        _indexed = True
+
+
+def _signature_of(doc: dict) -> Optional[bytes]:
+    return hasher.signature(job_shingles(doc.get("title"), doc.get("company"), doc.get("description")))
+
+
+def annotate(collection, docs: Dict[str, dict]) -> Dict[str, str]:
+    """
+    Ingesta: agrega a cada documento del lote su firma (minhash) y sus bandas LSH
+    (lsh_bands), y devuelve el cluster_id que le corresponde: el de la oferta guardada
+    (o del mismo lote) más parecida sobre DEDUP_THRESHOLD, o su propio _id si no hay.
+    """
+    ensure_index(collection)
+    sigs: Dict[str, bytes] = {}
+    for job_id, doc in docs.items():
+        sig = _signature_of(doc)
+        if sig is None:
+            continue
+        doc["minhash"] = sig
+        doc["lsh_bands"] = hasher.band_keys(sig)
+        sigs[job_id] = sig
+    if not sigs:
+        return {}
+
+    # Todas las candidatas del lote en una sola consulta por índice
+    buckets: Dict[str, List[Tuple[str, bytes, str]]] = {}
+    keys = list({k for job_id in sigs for k in docs[job_id]["lsh_bands"]})
+    query = {"lsh_bands": {"$in": keys}, "_id": {"$nin": list(sigs)}}
+    for cand in collection.find(query, {"minhash": 1, "lsh_bands": 1, "cluster_id": 1}):
+        if not hasher.valid(cand.get("minhash")):
+            continue
+        entry = (cand["_id"], cand["minhash"], cand.get("cluster_id") or cand["_id"])
+        for k in cand.get("lsh_bands") or ():
+            buckets.setdefault(k, []).append(entry)
+
+    clusters: Dict[str, str] = {}
+    for job_id, sig in sigs.items():
+        bands = docs[job_id]["lsh_bands"]
+        best, best_sim = job_id, config.DEDUP_THRESHOLD
+        seen = set()
+        for k in bands:
+            for other_id, other_sig, other_cluster in buckets.get(k, ()):
+                if other_id in seen:
+                    continue
+                seen.add(other_id)
+                sim = hasher.similarity(sig, other_sig)
+                if sim >= best_sim:
+                    best, best_sim = other_cluster, sim
+        clusters[job_id] = best
+        # Lo ya asignado del lote también cuenta como candidata para el resto
+        for k in bands:
+            buckets.setdefault(k, []).append((job_id, sig, best))
+    return clusters
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        parent = self.parent
+        root = parent.setdefault(x, x)
+        while root != parent[root]:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: str, b: str):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # La raíz es el menor _id: el cluster_id no depende del orden de llegada
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+
+def _by_id_ranges(collection, query: dict, projection: dict, batch_size: int) -> Iterator[dict]:
+    """
+    Recorre la colección por tramos de _id. Cada tramo es una consulta nueva: escribir
+    en los documentos ya entregados no afecta a un cursor abierto.
+    """
+    last = None
+    while True:
+        page = dict(query)
+        if last is not None:
+            page["_id"] = {"$gt": last}
+        docs = list(collection.find(page, projection).sort("_id", 1).limit(batch_size))
+        if not docs:
+            return
+        yield from docs
+        last = docs[-1]["_id"]
+
+
+def rebuild_clusters(collection, batch_size: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Batch sobre toda la colección: completa firmas faltantes (o de otros parámetros),
+    recorre los buckets LSH con más de una oferta (agregación en el servidor), verifica
+    similitud y une clusters. Los clusters ya asignados en la ingesta se conservan (se
+    unen primero). Cada oferta queda con cluster_id = menor _id de su cluster.
+    Devuelve (firmas calculadas, cluster_id actualizados).
+    """
+    batch_size = batch_size or config.SAVE_BATCH_SIZE
+    ensure_index(collection)
+
+    # 1) firmas
+    signed = 0
+    ops: List[UpdateOne] = []
+    docs = _by_id_ranges(collection, {}, _SIG_FIELDS, config.EXPORT_BATCH_SIZE)
+    unsigned = (doc for doc in docs if not hasher.valid(doc.get("minhash")))
+    for doc in description_service.hydrated(collection, unsigned):
+        sig = _signature_of(doc)
+        update = {"minhash": sig, "lsh_bands": hasher.band_keys(sig) if sig else []}
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        signed += 1
+        if len(ops) >= batch_size:
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+
+    # 2) clusters de la ingesta -> union-find; así el rebuild solo suma uniones
+    uf = _UnionFind()
+    for doc in collection.find({"cluster_id": {"$exists": True}}, {"cluster_id": 1}, batch_size=config.EXPORT_BATCH_SIZE):
+        if doc["cluster_id"] != doc["_id"]:
+            uf.union(doc["_id"], doc["cluster_id"])
+
+    # 3) buckets -> uniones verificadas. La agregación solo cuenta (documentos chicos, sin
+    # $push de _ids que en un bucket caliente pase los 16MB); cada bucket se recorre
+    # entero con un cursor por lotes y se suelta al pasar al siguiente
+    pipeline = [
+        {"$unwind": "$lsh_bands"},
+        {"$group": {"_id": "$lsh_bands", "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ]
+    for bucket in collection.aggregate(pipeline, allowDiskUse=True):
+        members = collection.find({"lsh_bands": bucket["_id"]}, {"minhash": 1}, batch_size=config.EXPORT_BATCH_SIZE)
+        pivots: Deque[Tuple[str, bytes]] = deque(maxlen=_MAX_PIVOTS)
+        for doc in members:
+            sig = doc.get("minhash")
+            if not hasher.valid(sig):
+                continue
+            for pivot_id, pivot_sig in pivots:
+                if hasher.similarity(sig, pivot_sig) >= config.DEDUP_THRESHOLD:
+                    uf.union(pivot_id, doc["_id"])
+                    break
+            else:
+                pivots.append((doc["_id"], sig))
+
+    # 4) cluster_id
+    updated = 0
+    ops = []
+    for doc in _by_id_ranges(collection, {}, {"cluster_id": 1}, config.EXPORT_BATCH_SIZE):
+        job_id = doc["_id"]
+        cluster = uf.find(job_id) if job_id in uf.parent else job_id
+        if doc.get("cluster_id") != cluster:
+            ops.append(UpdateOne({"_id": job_id}, {"$set": {"cluster_id": cluster}}))
+            updated += 1
+            if len(ops) >= batch_size:
+                collection.bulk_write(ops, ordered=False)
+                ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return signed, updated
@@ -0,0 +1,117 @@
+import hashlib
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from utils import config
+from utils.html_parse import compact_html
+
+# Colección lateral (misma base que jobs): _id = hash del texto, z = texto comprimido
+DESCRIPTIONS = "descriptions"
+
+
+def _store_of(collection):
+    return collection.database[DESCRIPTIONS]
+
+
+def normalize(description: Optional[str]) -> Optional[str]:
+    text = compact_html(description)
+    return text or None
+
+
+def digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def store(collection, docs: Dict[str, dict]):
+    """
+    Saca la descripción de cada documento del lote: la normaliza, la guarda una sola vez
+    (comprimida) en `descriptions` y deja en el documento solo description_hash.
+    Textos repetidos (plantillas de una misma empresa) quedan en un único registro.
+    Los documentos sin el campo description (pendiente de detalle) se dejan tal cual.
+    """
+    pending: Dict[str, str] = {}
+    for doc in docs.values():
+        # Sin el campo (pendiente de detalle) no hay nada que guardar ni que pisar
+        if "description" not in doc:
+            continue
+        text = normalize(doc.pop("description"))
+        h = digest(text) if text else None
+        doc["description_hash"] = h
+        if h:
+            pending[h] = text
+    if not pending:
+        return
+
+    ops = [
+        UpdateOne(
+            {"_id": h},
+            {"$setOnInsert": {"z": Binary(zlib.compress(text.encode("utf-8"), config.DESCRIPTION_ZLIB_LEVEL)), "len": len(text)}},
+            upsert=True,
+        )
+        for h, text in pending.items()
+    ]
+    _store_of(collection).bulk_write(ops, ordered=False)
+
+
+def fetch(collection, hashes: Iterable[str]) -> Dict[str, str]:
+    wanted = list({h for h in hashes if h})
+    if not wanted:
+        return {}
+    return {
+        d["_id"]: zlib.decompress(d["z"]).decode("utf-8")
+        for d in _store_of(collection).find({"_id": {"$in": wanted}}, {"z": 1})
+    }
+
+
+def hydrated(collection, docs: Iterable[dict], batch_size: Optional[int] = None) -> Iterator[dict]:
+    """
+    Deja pasar documentos de jobs completando `description` desde su hash, resolviendo
+    los hashes de a lotes (una consulta por lote). Los documentos viejos que todavía
+    traen la descripción en línea pasan tal cual.
+    """
+    batch_size = batch_size or config.EXPORT_BATCH_SIZE
+    batch: List[dict] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield from _fill(collection, batch)
+            batch = []
+    if batch:
+        yield from _fill(collection, batch)
+
+
+def _fill(collection, batch: List[dict]) -> List[dict]:
+    texts = fetch(collection, (d.get("description_hash") for d in batch if d.get("description") is None))
+    for d in batch:
+        if d.get("description") is None and d.get("description_hash") in texts:
+            d["description"] = texts[d["description_hash"]]
+    return batch
+
+
+def compact_existing(collection, batch_size: Optional[int] = None) -> int:
+    """Migra los documentos que aún tienen la descripción en línea. Devuelve cuántos."""
+    batch_size = batch_size or config.SAVE_BATCH_SIZE
+    count = 0
+    batch: Dict[str, dict] = {}
+
+    def flush():
+        store(collection, batch)
+        ops = [
+            UpdateOne({"_id": job_id}, {"$set": {"description_hash": doc["description_hash"]}, "$unset": {"description": ""}})
+            for job_id, doc in batch.items()
+        ]
+        collection.bulk_write(ops, ordered=False)
+        batch.clear()
+
+    query = {"description": {"$exists": True}}
+    for doc in collection.find(query, {"description": 1}, batch_size=config.EXPORT_BATCH_SIZE):
+        batch[doc["_id"]] = doc
+        count += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return count
@@ -0,0 +1,177 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils import config
+
+# Parquet necesita pyarrow (está en requirements.txt); sin él solo queda NDJSON
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FORMATS = ("ndjson", "parquet")
+
+# Tipos de columna para Parquet; el resto va como texto
+_BOOL_FIELDS = {"isPractice", "remote"}
+_TIME_FIELDS = {"published_at"}
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def check_format(fmt: str):
+    """Falla antes de crawlear / leer Mongo si el formato no se puede escribir."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de export desconocido: {fmt}")
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("EXPORT_FORMAT=parquet requiere pyarrow (pip install pyarrow, ver requirements.txt)")
+
+
+class PartitionedExport:
+    """
+    Export particionado por sitio y fecha de publicación, estilo Hive:
+
+        <root>/website=linkedin/date=2024-05-01/part-<run>-00000.ndjson.gz
+
+    Las filas se acumulan por partición y se escriben en chunks de `chunk_rows`
+    (también cuando el total en memoria pasa de `max_buffered`), así un export grande
+    no se arma entero en memoria. manifest.json lista cada archivo con su cantidad de
+    filas; exports sucesivos agregan archivos y entradas, no pisan los anteriores.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        fmt: str,
+        fields: Sequence[str],
+        chunk_rows: Optional[int] = None,
+        partition: Optional[str] = None,
+        max_buffered: Optional[int] = None,
+    ):
+        check_format(fmt)
+        self.root = root
+        self.fmt = fmt
+        self.fields = list(fields)
+        self.chunk_rows = chunk_rows or config.EXPORT_CHUNK_ROWS
+        self.partition = (partition or config.EXPORT_PARTITION).lower()
+        self.max_buffered = max_buffered or self.chunk_rows * 4
+        self.run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        self._buffers: Dict[Tuple[str, str], List[dict]] = {}
+        self._buffered = 0
+        self._parts: Dict[Tuple[str, str], int] = {}
+        self._files: List[dict] = []
+
+    # ---------- escritura ----------
+    def write(self, doc: Dict[str, Any]):
+        row = {f: _plain(doc.get(f)) for f in self.fields}
+        key = self._partition_of(row)
+        buf = self._buffers.setdefault(key, [])
+        buf.append(row)
+        self._buffered += 1
+        if len(buf) >= self.chunk_rows:
+            self._flush(key)
+        elif self._buffered >= self.max_buffered:
+            self._flush(max(self._buffers, key=lambda k: len(self._buffers[k])))
+
+    def write_all(self, docs: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for doc in docs:
+            self.write(doc)
+            count += 1
+        return count
+
+    def close(self) -> dict:
+        for key in list(self._buffers):
+            self._flush(key)
+        return self._write_manifest()
+
+    # ---------- internos ----------
+    def _partition_of(self, row: dict) -> Tuple[str, str]:
+        website = str(row.get("website") or "unknown")
+        published = row.get("published_at")
+        if isinstance(published, datetime):
+            date = published.strftime("%Y-%m" if self.partition == "month" else "%Y-%m-%d")
+        else:
+            date = "unknown"
+        return website, date
+
+    def _flush(self, key: Tuple[str, str]):
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        self._buffered -= len(rows)
+
+        website, date = key
+        n = self._parts.get(key, 0)
+        self._parts[key] = n + 1
+        directory = os.path.join(self.root, f"website={website}", f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        ext = "ndjson.gz" if self.fmt == "ndjson" else "parquet"
+        path = os.path.join(directory, f"part-{self.run_id}-{n:05d}.{ext}")
+
+        if self.fmt == "ndjson":
+            with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+                    f.write("\n")
+        else:
+            pq.write_table(pa.Table.from_pylist(rows, schema=self._schema()), path, compression="zstd")
+
+        self._files.append({
+            "path": os.path.relpath(path, self.root),
+            "website": website,
+            "date": date,
+            "rows": len(rows),
+        })
+
+    def _schema(self):
+        cols = []
+        for f in self.fields:
+            if f in _BOOL_FIELDS:
+                cols.append(pa.field(f, pa.bool_()))
+            elif f in _TIME_FIELDS:
+                cols.append(pa.field(f, pa.timestamp("s")))
+            else:
+                cols.append(pa.field(f, pa.string()))
+        return pa.schema(cols)
+
+    def _write_manifest(self) -> dict:
+        path = os.path.join(self.root, "manifest.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = {"files": []}
+
+        manifest["fields"] = self.fields
+        manifest["partitioning"] = ["website", f"date ({self.partition})"]
+        manifest["files"].extend(self._files)
+        manifest.setdefault("runs", []).append({
+            "run_id": self.run_id,
+            "format": self.fmt,
+            "rows": sum(f["rows"] for f in self._files),
+            "files": len(self._files),
+        })
+        manifest["total_rows"] = sum(f["rows"] for f in manifest["files"])
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+        return manifest
@@ -1,14 +1,253 @@
-from pymongo import MongoClient
+import threading
+import time
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne
 from classes.job import Job
-from typing import List
-from utils.config import MONGO_URI
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from utils import rules
+from utils.config import (
+    MONGO_URI, SAVE_BATCH_SIZE, SAVE_FLUSH_SECONDS, EXPORT_BATCH_SIZE,
+    DEDUP_AT_INGEST, SEARCH_INDEX_AT_INGEST, DESCRIPTION_STORE,
+)
+from utils.filters import position_filter
+from utils.text_index import document_terms
+from utils.threaded_queue import ThreadedQueue
+from services import dedup_service, description_service
 
 client = MongoClient(MONGO_URI)
 db = client.get_database("jobs_db")
 collection = db.jobs
 
+# Derivados del texto: en un job solo de listado (sin descripción) salen más pobres
+_TEXT_DERIVED = ("minhash", "lsh_bands", "title_terms", "terms")
+
 def save_many_jobs(jobs: List[Job]):
+    """
+    Upsert idempotente: cada oferta queda en un único documento con _id = job.job_id
+    (el índice único de _id hace de clave). Reprocesar la misma oferta no escribe nada
+    si no cambió; published_at solo puede retroceder (las fechas relativas de LinkedIn
+    se recalculan en cada corrida), positions solo suma posiciones y position (la
+    principal) queda la de la primera vez.
+    """
     if not jobs:
         return
-    data = [job.to_dict() for job in jobs]
-    collection.insert_many(data)
+
+    # Dentro del lote gana la última versión de cada ID
+    docs: Dict[str, dict] = {}
+    for job in jobs:
+        doc = job.to_document()
+        prev = docs.get(job.job_id)
+        if prev is not None:
+            # La misma oferta bajo otra posición: se acumulan y la principal es la primera vista.
+            # Una versión solo de listado no reemplaza a la que ya trae el detalle
+            positions = list(dict.fromkeys(prev["positions"] + doc["positions"]))
+            if doc["pending"] and not prev["pending"]:
+                doc = prev
+            doc["positions"] = positions
+            doc["position"] = prev["position"]
+        docs[job.job_id] = doc
+    # Campos derivados (utils.rules) para todos los sitios: modalidad y jornada solo si el
+    # sitio no las trajo ni quedan pendientes del detalle. El cargo que dice el título va
+    # en inferred_position, aparte de positions (las búsquedas por posición no lo usan)
+    labels = rules.classify_many(_classify_input(doc) for doc in docs.values())
+    for doc, label in zip(docs.values(), labels):
+        doc["inferred_position"] = label.position.value if label.position else None
+        for field, value in (("modality", label.modality), ("type_", label.type_)):
+            if value is not None and not doc.get(field) and field not in doc["pending"]:
+                doc[field] = value.value
+    # Los campos pendientes (job armado desde un listado) no se escriben: no pisan un detalle previo
+    for doc in docs.values():
+        for field in doc["pending"]:
+            doc.pop(field, None)
+
+    # Duplicados entre sitios: una oferta nueva entra al cluster de la más parecida ya guardada.
+    # Un job solo de listado firmaría con título + empresa (ofertas distintas con el mismo
+    # título quedarían juntas): se agrupa recién cuando llega su detalle
+    clusters: Dict[str, str] = {}
+    reclustered: Set[str] = set()
+    complete = {job_id: doc for job_id, doc in docs.items() if not doc["pending"]}
+    if DEDUP_AT_INGEST and complete:
+        clusters = dedup_service.annotate(collection, complete)
+        # Guardados antes como pendientes: su cluster_id se fija ahora, no solo al insertar
+        pending_before = {"_id": {"$in": list(complete)}, "pending.0": {"$exists": True}}
+        reclustered = {d["_id"] for d in collection.find(pending_before, {"_id": 1})}
+    if SEARCH_INDEX_AT_INGEST:
+        for doc in docs.values():
+            doc.update(document_terms(doc))
+    # Al final: firma y términos ya usaron el texto; el documento se queda solo con el hash
+    if DESCRIPTION_STORE:
+        description_service.store(collection, docs)
+
+    now = datetime.utcnow()
+    ops = []
+    for job_id, doc in docs.items():
+        published_at = doc.pop("published_at", None)
+        positions = doc.pop("positions")
+        # La posición principal es la de la primera vez: positions ya lleva todas
+        on_insert = {"first_seen_at": now, "position": doc.pop("position")}
+        if job_id in reclustered:
+            doc["cluster_id"] = clusters.get(job_id, job_id)
+        else:
+            on_insert["cluster_id"] = clusters.get(job_id, job_id)
+        if doc["pending"]:
+            # Firma, términos y la marca de pendiente solo valen si el documento es nuevo
+            for field in (*_TEXT_DERIVED, "pending"):
+                if field in doc:
+                    on_insert[field] = doc.pop(field)
+        update = {"$set": doc, "$setOnInsert": on_insert, "$addToSet": {"positions": {"$each": positions}}}
+        if published_at is not None:
+            update["$min"] = {"published_at": published_at}
+        if DESCRIPTION_STORE and "description_hash" in doc:
+            update["$unset"] = {"description": ""}
+        ops.append(UpdateOne({"_id": job_id}, update, upsert=True))
+
+    collection.bulk_write(ops, ordered=False)
+
+
+def _with_ticks(jobs: Iterable[Job], tick: float) -> Iterator[Optional[Job]]:
+    """
+    Deja pasar el stream leyéndolo desde un hilo aparte y entrega None cada `tick`
+    segundos sin novedades: quien consume puede escribir aunque el crawl esté detenido.
+    """
+    out: ThreadedQueue[Job] = ThreadedQueue(SAVE_BATCH_SIZE)
+
+    def produce():
+        it = iter(jobs)
+        with out.producer():
+            for job in it:
+                if not out.put(job):
+                    # Quien consume se fue (p. ej. falló Mongo): se cierra el stream del spider
+                    close = getattr(it, "close", None)
+                    if close is not None:
+                        close()
+                    return
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        yield from out.drain(tick=tick)
+    finally:
+        out.close()
+        thread.join(timeout=5)
+
+
+def save_jobs_stream(
+    jobs: Iterable[Job],
+    batch_size: Optional[int] = None,
+    flush_seconds: Optional[float] = None,
+) -> int:
+    """
+    Consume un stream de Job y lo escribe en lotes de `batch_size`.
+    Un lote incompleto también se escribe si lleva más de `flush_seconds` esperando,
+    aunque no lleguen jobs nuevos (p. ej. el crawl quedó esperando un Retry-After),
+    así los primeros resultados llegan a Mongo apenas parte el crawl.
+    Devuelve cuántos jobs se guardaron.
+    """
+    batch_size = batch_size or SAVE_BATCH_SIZE
+    flush_seconds = SAVE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+
+    total = 0
+    batch: List[Job] = []
+    started = time.monotonic()
+    for job in _with_ticks(jobs, tick=max(0.05, min(1.0, flush_seconds))):
+        if job is not None:
+            if not batch:
+                started = time.monotonic()
+            batch.append(job)
+        if batch and (len(batch) >= batch_size or time.monotonic() - started >= flush_seconds):
+            save_many_jobs(batch)
+            total += len(batch)
+            batch = []
+
+    if batch:
+        save_many_jobs(batch)
+        total += len(batch)
+    return total
+
+
+def reclassify_jobs(query: Optional[dict] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Recalcula los campos derivados (utils.rules) sobre lo ya guardado, por lotes.
+    isPractice e inferred_position se recalculan siempre; modalidad y jornada solo se
+    completan si faltan (las que vinieron del sitio no se pisan). Devuelve cuántos cambiaron.
+    """
+    batch_size = batch_size or SAVE_BATCH_SIZE
+    projection = {
+        "title": 1, "location": 1, "description": 1, "description_hash": 1,
+        "modality": 1, "type_": 1, "isPractice": 1, "inferred_position": 1,
+    }
+    cursor = description_service.hydrated(collection, collection.find(query or {}, projection, batch_size=batch_size))
+
+    changed = 0
+    batch: List[dict] = []
+
+    def flush():
+        nonlocal changed
+        ops = []
+        for doc, label in zip(batch, rules.classify_many(_classify_input(d) for d in batch)):
+            update = {}
+            if doc.get("isPractice") != label.is_practice:
+                update["isPractice"] = label.is_practice
+            inferred = label.position.value if label.position else None
+            if doc.get("inferred_position") != inferred:
+                update["inferred_position"] = inferred
+            for field, value in (("modality", label.modality), ("type_", label.type_)):
+                if value is not None and not doc.get(field):
+                    update[field] = value.value
+            if update:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        if ops:
+            collection.bulk_write(ops, ordered=False)
+            changed += len(ops)
+        batch.clear()
+
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return changed
+
+
+def _classify_input(doc: dict) -> Tuple[Optional[str], str]:
+    # Modalidad y jornada también se buscan en la ubicación y la descripción
+    return doc.get("title"), f"{doc.get('location') or ''} {doc.get('description') or ''}"
+
+
+def find_jobs(
+    fields: Sequence[str],
+    websites: Optional[Sequence[str]] = None,
+    positions: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    seen_after: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+):
+    """
+    Cursor del servidor sobre las ofertas guardadas, trayendo solo `fields`.
+    since/until filtran por published_at; seen_after por first_seen_at (exports incrementales).
+    Se itera por lotes de `batch_size`: la memoria no depende del tamaño de la colección.
+    """
+    query: dict = {}
+    if websites:
+        query["website"] = {"$in": list(websites)}
+    if positions:
+        query.update(position_filter(positions))
+    if since or until:
+        query["published_at"] = {}
+        if since:
+            query["published_at"]["$gte"] = since
+        if until:
+            query["published_at"]["$lt"] = until
+    if seen_after:
+        query["first_seen_at"] = {"$gt": seen_after}
+
+    projection = {field: 1 for field in fields}
+    projection["_id"] = 0
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    if "description" not in fields:
+        return collection.find(query, projection, batch_size=batch_size)
+    # La descripción vive en la colección lateral: se resuelve por hash, de a lotes
+    projection["description_hash"] = 1
+    return description_service.hydrated(collection, collection.find(query, projection, batch_size=batch_size), batch_size)
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from pymongo import DESCENDING, UpdateOne
+
+from utils import config
+from utils.filters import ensure_indexes, position_filter
+from utils.text_index import document_terms, query_terms
+from services import description_service
+
+_RESULT_FIELDS = {
+    "title": 1, "company": 1, "location": 1, "website": 1, "position": 1,
+    "modality": 1, "published_at": 1, "url": 1, "title_terms": 1,
+}
+# Peso de un término que aparece en el título frente a uno solo en el cuerpo
+_TITLE_WEIGHT = 3
+
+def search(
+    collection,
+    query: str,
+    websites: Optional[Sequence[str]] = None,
+    positions: Optional[Sequence[str]] = None,
+    modalities: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 20,
+    candidates: Optional[int] = None,
+) -> List[dict]:
+    """
+    Ofertas que contienen todos los términos de `query` (normalizados igual que al
+    indexar), filtradas por índice. Se toman los `candidates` más recientes y se
+    rankean por coincidencias en el título y luego por fecha.
+    """
+    ensure_indexes(collection)
+    qterms = query_terms(query)
+
+    filt: dict = {}
+    if qterms:
+        filt["terms"] = {"$all": qterms}
+    if websites:
+        filt["website"] = {"$in": list(websites)}
+    if positions:
+        filt.update(position_filter(positions))
+    if modalities:
+        filt["modality"] = {"$in": list(modalities)}
+    if since or until:
+        filt["published_at"] = {}
+        if since:
+            filt["published_at"]["$gte"] = since
+        if until:
+            filt["published_at"]["$lt"] = until
+
+    cursor = (
+        collection.find(filt, _RESULT_FIELDS)
+        .sort("published_at", DESCENDING)
+        .limit(candidates or config.SEARCH_CANDIDATES)
+    )
+
+    results = []
+    for doc in cursor:
+        title_terms = set(doc.pop("title_terms", None) or ())
+        doc["score"] = sum(_TITLE_WEIGHT if t in title_terms else 1 for t in qterms)
+        results.append(doc)
+    # sort estable: a igual puntaje se mantiene el orden por fecha del cursor
+    results.sort(key=lambda d: d["score"], reverse=True)
+    return results[:limit]
+
+
+def reindex(collection, only_missing: bool = True, batch_size: Optional[int] = None) -> int:
+    """Calcula terms / title_terms de lo ya guardado (p. ej. lo anterior al índice)."""
+    ensure_indexes(collection)
+    batch_size = batch_size or config.SAVE_BATCH_SIZE
+    query = {"terms": {"$exists": False}} if only_missing else {}
+    fields = {"title": 1, "company": 1, "location": 1, "description": 1, "description_hash": 1}
+
+    count = 0
+    ops: List[UpdateOne] = []
+    docs = collection.find(query, fields, batch_size=config.EXPORT_BATCH_SIZE)
+    for doc in description_service.hydrated(collection, docs):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": document_terms(doc)}))
+        count += 1
+        if len(ops) >= batch_size:
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return count
@@ -1,12 +1,18 @@
 from classes.job import Job
 from utils.enums import Position, Website
 from utils.fetch import laborum_fetch
-from typing import List
+from utils.async_fetch import laborum_fetch_async, map_unordered, stream_async
+from utils.crawl_state import crawl_state, newest_first
+from utils import config
+from typing import AsyncIterator, Iterator, List, Tuple
 from datetime import datetime
+from functools import partial
 
 class LaborumSpider:
     def __init__(self):
         self.base_url = 'https://www.laborum.cl/api/avisos/searchV2'
+        # Páginas más grandes = menos round-trips por posición
+        self.search_url = f"{self.base_url}?pageSize={config.LABORUM_PAGE_SIZE}&sort={config.LABORUM_SORT}"
         self.job_base_url = 'https://www.laborum.cl/empleos/'
 
         self.headers = {
@@ -15,29 +21,80 @@ class LaborumSpider:
             'Content-Type': 'application/json'
         }
 
-    def run(self) -> List[Job]:
-        all_jobs: List[Job] = []
+    def run(self) -> Iterator[Job]:
+        crawl_state.begin(Website.LABORUM)
+        return crawl_state.track(stream_async(self._stream))
 
-        for position in Position:
-            pages = self.get_pages(position)
-            for page in pages:
-                jobs = self.get_jobs(position, page)
-                all_jobs.extend(jobs)
+    async def _stream(self) -> AsyncIterator[Job]:
+        # La página 1 trae los primeros avisos y el total: no se vuelve a pedir
+        async for position, first in map_unordered(self._first_page, Position):
+            jobs = self._jobs_from(first, position)
+            for job in jobs:
+                yield job
+            rest = self._pages_from(first)[1:]
 
-        return all_jobs
+            mark = crawl_state.mark(Website.LABORUM, position)
+            if mark is None or not newest_first(job.published_at for job in jobs):
+                async for job in self._fan_out(position, rest):
+                    yield job
+                continue
+
+            # Incremental: en orden, hasta la primera página que ya estaba completa.
+            # Si el listado deja de venir por fecha, el corte no es seguro: se pide el resto
+            if not jobs or all(mark.covers(job.published_at, job.source_id) for job in jobs):
+                continue
+            last = jobs[-1].published_at
+            for i, page in enumerate(rest):
+                jobs = await self._get_jobs_async(position, page)
+                for job in jobs:
+                    yield job
+                if not newest_first([last, *(job.published_at for job in jobs)]):
+                    async for job in self._fan_out(position, rest[i + 1:]):
+                        yield job
+                    break
+                if not jobs or all(mark.covers(job.published_at, job.source_id) for job in jobs):
+                    break
+                last = jobs[-1].published_at
+
+    async def _fan_out(self, position: Position, pages: List[int]) -> AsyncIterator[Job]:
+        async for jobs in map_unordered(partial(self._get_jobs_async, position), pages):
+            for job in jobs:
+                yield job
+
+    async def _first_page(self, position: Position) -> Tuple[Position, dict | None]:
+        return position, await self._fetch_page_async(position, 1)
+
+    async def _fetch_page_async(self, position: Position, page: int) -> dict | None:
+        # El plazo va en el propio request (LABORUM_TIMEOUT): así el cupo del sitio se
+        # suelta recién cuando el hilo termina y nunca hay más requests en vuelo que el límite
+        body = {'query': position.value, 'pagina': page}
+        data = await laborum_fetch_async(self.search_url, self.headers, body, config.LABORUM_TIMEOUT)
+        if data is None:
+            # Página caída (incluido el timeout): no es lo mismo que una vacía para las marcas
+            crawl_state.page_failed(Website.LABORUM)
+        return data
 
     def get_pages(self, position: Position) -> List[int]:
         body = {'query': position.value, 'pagina': 1}
-        data = laborum_fetch(self.base_url, self.headers, body)
-        if data is None:
+        data = laborum_fetch(self.search_url, self.headers, body, config.LABORUM_TIMEOUT)
+        return self._pages_from(data)
+
+    def get_jobs(self, position: Position, page: int) -> List[Job]:
+        body = {'query': position.value, 'pagina': page}
+        data = laborum_fetch(self.search_url, self.headers, body, config.LABORUM_TIMEOUT)
+        return self._jobs_from(data, position)
+
+    async def _get_jobs_async(self, position: Position, page: int) -> List[Job]:
+        return self._jobs_from(await self._fetch_page_async(position, page), position)
+
+    def _pages_from(self, data: dict | None) -> List[int]:
+        if not data or not data.get("size"):
             return []
 
         total_pages = -(-data["totalSearched"] // data["size"])
         return list(range(1, total_pages + 1))
 
-    def get_jobs(self, position: Position, page: int) -> List[Job]:
-        body = {'query': position.value, 'pagina': page}
-        data = laborum_fetch(self.base_url, self.headers, body)
+    def _jobs_from(self, data: dict | None, position: Position) -> List[Job]:
         if data is None or "content" not in data:
             return []
 
@@ -1,23 +1,129 @@
 # src/spiders/api/linkedin.py
 from __future__ import annotations
 
+import json
+import queue
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional
-from urllib.parse import urlencode
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
 
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
 
-from classes.job import Job
+from classes.job import Job, linkedin_job_id
 from utils.enums import Website, Position, Modality
-from utils import config
+from utils import config, rules
 from utils.fetch import linkedin_fetch
+from utils.html_parse import parse_detail, parse_list, canonical_url
+from utils.crawl_state import crawl_state
+from utils.seen_index import seen_index
+from utils.detail_queue import DetailQueue, offers_by_id
+from utils.async_fetch import linkedin_fetch_async, map_unordered, stream_async
+from utils.adaptive_timeout import AdaptiveTimeout
+from utils.threaded_queue import ThreadedQueue
+from utils.selector_cache import selector_cache
+from spiders.api.linkedin_voyager import VoyagerCollector, VOYAGER_POSTING_URL
 
 
 BASE_UI = "https://www.linkedin.com/jobs/search/"
 BASE_GUEST = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
 
+# Lo que la UI descarga y no usamos: se aborta en el route del contexto
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCKED_URL_PARTS = (
+    "/li/track", "/tscp-serving/", "px.ads.linkedin.com", "/realtime/", "platform-telemetry",
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "bat.bing.com",
+)
+
+# Variantes por layout de LinkedIn; selector_cache recuerda cuál anda y la prueba primero
+CARD_VARIANTS = (
+    "li.jobs-search-results__list-item",
+    "li[data-occludable-job-id]",
+    "ul.scaffold-layout__list-container li",
+    "div.job-card-container--clickable",
+)
+CARD_SELECTOR = ", ".join(CARD_VARIANTS)
+CONTAINER_VARIANTS = (
+    "section.two-pane-serp-page__results-list",
+    "div.jobs-search-results-list",
+    "[data-results-list]",
+    "div.scaffold-layout__list",
+)
+COOKIE_VARIANTS = (
+    "button[aria-label*='cookies' i]",
+    "button:has-text('Aceptar todas')",
+    "button:has-text('Aceptar todo')",
+    "button:has-text('Aceptar')",
+    "button:has-text('Accept all')",
+    "button:has-text('Accept')",
+    "button:has-text('I agree')",
+)
+RESULTS_SELECTOR = ",".join([
+    "ul.scaffold-layout__list-container li",
+    "li.jobs-search-results__list-item",
+    "li[data-occludable-job-id]",
+    "[data-results-list]",
+    "a[href*='/jobs/view/']",
+])
+DETAIL_TITLE_SELECTOR = ".top-card-layout__title, .job-details-jobs-unified-top-card__job-title, h1.t-24.t-bold"
+_LOGIN_MARKERS = ("login", "authwall", "checkpoint")
+
+# El panel de detalle muestra la oferta pedida (no la anterior) y ya tiene título
+_DETAIL_READY_JS = """
+([id, sel]) => {
+  const cur = new URLSearchParams(location.search).get('currentJobId');
+  const shown = cur ? cur === id : location.pathname.includes(id);
+  return shown && !!document.querySelector(sel);
+}
+"""
+_MORE_CARDS_JS = "([sel, n]) => document.querySelectorAll(sel).length > n"
+
+STATE_PATH = "state.json"
+LINKEDIN_ORIGIN = "https://www.linkedin.com"
+
+# ID de oferta de cada card, en el mismo orden que _cards_locator
+_CARD_IDS_JS = """
+els => els.map(el => {
+  const holder = el.closest('[data-occludable-job-id]') || el.querySelector('[data-occludable-job-id], [data-job-id]');
+  const id = (holder && (holder.getAttribute('data-occludable-job-id') || holder.getAttribute('data-job-id')))
+    || el.getAttribute('data-job-id');
+  if (id) return id;
+  const a = el.querySelector("a[href*='/jobs/view/']") || (el.matches("a[href*='/jobs/view/']") ? el : null);
+  const m = a && a.href.match(/\\/jobs\\/view\\/(?:[^\\/?]*-)?(\\d{6,})/);
+  return m ? m[1] : '';
+})
+"""
+
+
+class SessionExpired(RuntimeError):
+    """LinkedIn mandó a login/authwall: la cookie guardada ya no vale del lado del servidor."""
+
+
+def _on_login_wall(url: str) -> bool:
+    return any(k in url for k in _LOGIN_MARKERS)
+
+
+def _has_session(cookies: List[dict]) -> bool:
+    # li_at es la cookie de sesión; si está y no venció no hace falta pasar por /feed/
+    now = time.time()
+    for c in cookies:
+        if c.get("name") == "li_at" and "linkedin.com" in c.get("domain", ""):
+            expires = c.get("expires", -1)
+            return expires is None or expires < 0 or expires > now
+    return False
+
+
+def _stored_cookies(path: str) -> List[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("cookies") or []
+    except (OSError, ValueError):
+        return []
+
 
 @dataclass
 class _Link:
@@ -33,119 +139,297 @@ class LinkedInSpider:
             getattr(config, "LINKEDIN_F_TPR_SECONDS", None)
             or int(getattr(config, "LINKEDIN_HOURS", 4)) * 3600
         )
+        # Con una corrida previa exitosa, la ventana es "desde entonces" (+1h de margen)
+        self.f_tpr_seconds = crawl_state.window_seconds(self.website, default=self.f_tpr_seconds)
         self.location = str(getattr(config, "LINKEDIN_LOCATION", "Chile") or "Chile")
         self.keywords = str(getattr(config, "LINKEDIN_KEYWORDS", "")).strip()
         self.max_pages = int(getattr(config, "LINKEDIN_MAX_PAGES", 6))
         self.headless = str(getattr(config, "LINKEDIN_HEADLESS", "0")).lower() in ("1", "true", "yes")
-
-    def run(self) -> List[Job]:
+        self.ui_workers = int(getattr(config, "LINKEDIN_UI_WORKERS", 3))
+        self.ui_capture = bool(getattr(config, "LINKEDIN_UI_CAPTURE", True))
+        self.ui_capture_details = bool(getattr(config, "LINKEDIN_UI_CAPTURE_DETAILS", True))
+        self.cdp_url = str(getattr(config, "LINKEDIN_CDP_URL", "") or "").strip()
+        # Esperas por evento con timeout según lo que LinkedIn viene tardando (segundos)
+        self.waits = {
+            "results": AdaptiveTimeout(initial=10, floor=3, ceiling=25),
+            "detail": AdaptiveTimeout(initial=6, floor=1.5, ceiling=20),
+            "scroll": AdaptiveTimeout(initial=2, floor=0.6, ceiling=5),
+        }
+
+    def run(self) -> Iterator[Job]:
+        crawl_state.begin(self.website)
+        return crawl_state.track(self._run())
+
+    def _run(self) -> Iterator[Job]:
         # Si falla la UI (ERR_HTTP_RESPONSE_CODE_FAILURE / checkpoint), se usa guest automáticamente
+        yielded: Set[str] = set()
         if not self.headless:
-            try:
-                return self._run_ui()
-            except Exception:
-                pass
-        return self._run_guest()
+            # Un li_at vigente en state.json puede estar revocado en el servidor: si la
+            # búsqueda cae en el authwall se reintenta una vez forzando el login
+            for force_login in (False, True):
+                try:
+                    for job in self._run_ui(force_login=force_login):
+                        if job.job_id not in yielded:
+                            yielded.add(job.job_id)
+                            yield job
+                    return
+                except SessionExpired as e:
+                    print(f"LinkedIn: session rejected ({e})")
+                    continue
+                except Exception:
+                    break
+        # Lo que la UI alcanzó a entregar no se vuelve a pedir ni a entregar
+        yield from self._run_guest(skip=yielded)
 
     # ---------- UI ----------
 
-    def _run_ui(self) -> List[Job]:
-        jobs: List[Job] = []
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=False,
-                args=["--disable-blink-features=AutomationControlled", "--no-sandbox"],
-            )
+    def _run_ui(self, force_login: bool = False) -> Iterator[Job]:
+        # Login una sola vez (y solo si la sesión guardada no sirve): los workers arrancan logueados
+        if force_login or self.cdp_url or not _has_session(_stored_cookies(STATE_PATH)):
+            with sync_playwright() as p:
+                page, close = self._open_ui_page(p, block_resources=False)
+                try:
+                    if force_login or not _has_session(page.context.cookies(LINKEDIN_ORIGIN)):
+                        self._ensure_login(page)
+                    if not self.cdp_url:
+                        page.context.storage_state(path=STATE_PATH)
+                finally:
+                    close()
+
+        positions: "queue.Queue[Position]" = queue.Queue()
+        for position in Position:
+            positions.put(position)
+        out: ThreadedQueue[Job] = ThreadedQueue(config.STREAM_WINDOW)
+
+        n = max(1, min(self.ui_workers, len(Position)))
+        workers = [
+            threading.Thread(target=self._ui_worker, args=(positions, out), daemon=True)
+            for _ in range(n)
+        ]
+        for w in workers:
+            w.start()
+
+        try:
+            # El error de un worker se re-lanza acá y dispara el fallback a guest
+            yield from out.drain(producers=n)
+        finally:
+            out.close()
+            for w in workers:
+                w.join(timeout=30)
+
+    def _ui_worker(self, positions: "queue.Queue[Position]", out: ThreadedQueue[Job]):
+        # Cada hilo tiene su propio Playwright (la API sync no se comparte entre hilos)
+        with out.producer(), sync_playwright() as p:
+            page, close = self._open_ui_page(p)
             try:
-                context = browser.new_context(storage_state="state.json")
-            except Exception:
-                context = browser.new_context()
+                collector = None
+                if self.ui_capture:
+                    collector = VoyagerCollector()
+                    page.on("response", collector.on_response)
+                while not out.closed:
+                    try:
+                        position = positions.get_nowait()
+                    except queue.Empty:
+                        break
+                    for job in self._crawl_position_ui(page, position, collector):
+                        if not out.put(job):
+                            return
+            finally:
+                close()
+
+    def _open_ui_page(self, p, block_resources: bool = True):
+        """
+        Devuelve (page, close). Con LINKEDIN_CDP_URL se abre una pestaña en el navegador
+        persistente (ya logueado) y close() cierra solo esa pestaña; si no, se lanza un
+        Chromium propio desde state.json y close() lo cierra entero.
+        """
+        if self.cdp_url:
+            browser = p.chromium.connect_over_cdp(self.cdp_url)
+            context = browser.contexts[0] if browser.contexts else browser.new_context()
             page = context.new_page()
+            # El contexto es compartido entre workers: el bloqueo va por pestaña
+            if block_resources:
+                page.route("**/*", _block_unneeded)
+            return page, page.close
+
+        browser = p.chromium.launch(
+            headless=False,
+            args=["--disable-blink-features=AutomationControlled", "--no-sandbox"],
+        )
+        try:
+            context = browser.new_context(storage_state=STATE_PATH)
+        except Exception:
+            context = browser.new_context()
+        if block_resources:
+            context.route("**/*", _block_unneeded)
+
+        def close():
+            context.close()
+            browser.close()
 
+        return context.new_page(), close
+
+    def _crawl_position_ui(self, page, position: Position, collector: Optional[VoyagerCollector] = None) -> Iterator[Job]:
+        if collector is not None:
+            collector.clear()
+        kw = self.keywords or position.value
+        url = self._build_search_url_ui(kw)
+        try:
+            page.goto(url, timeout=60_000, wait_until="domcontentloaded")
+        except Exception as e:
+            raise RuntimeError(f"goto failed: {e}")  # dispara fallback
+        if _on_login_wall(page.url):
+            raise SessionExpired(page.url)
+
+        self._accept_cookies(page)
+        if not self._wait_results(page):
             try:
-                self._ensure_login(page)
+                page.wait_for_load_state("networkidle", timeout=10_000)
+            except PWTimeout:
+                pass
+            if _on_login_wall(page.url):
+                raise SessionExpired(page.url)
+            if not self._wait_results(page):
+                return
 
-                for position in Position:
-                    kw = self.keywords or position.value
-                    url = self._build_search_url_ui(kw)
-                    try:
-                        page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-                    except Exception as e:
-                        raise RuntimeError(f"goto failed: {e}")  # dispara fallback
-
-                    self._accept_cookies(page)
-                    if not self._wait_results(page):
-                        try:
-                            page.wait_for_load_state("networkidle", timeout=10_000)
-                        except PWTimeout:
-                            pass
-                        if not self._wait_results(page):
-                            continue
-
-                    self._force_links_same_tab(page)
-                    self._scroll_results(page, max_scrolls=10)
-
-                    while True:
-                        if page.is_closed():
-                            break
-                        cards = self._cards_locator(page)
-                        count = cards.count()
-                        if count == 0:
-                            break
-
-                        for i in range(count):
-                            if page.is_closed():
-                                break
-                            try:
-                                li = cards.nth(i)
-                                a = li.locator("a[href*='/jobs/view/']")
-                                if a.count():
-                                    a.first.click(timeout=10_000)
-                                else:
-                                    li.click(timeout=10_000)
-
-                                page.wait_for_selector(
-                                    ".top-card-layout__title, .job-details-jobs-unified-top-card__job-title, h1.t-24.t-bold",
-                                    timeout=20_000,
-                                )
-
-                                html = page.content()
-                                soup = BeautifulSoup(html, "html.parser")
-                                job_url = self._extract_job_url(page, soup)
-                                modality = self._guess_modality_from_detail(soup)
-                                date = datetime.utcnow()
-
-                                job = Job(
-                                    title="",
-                                    company="",
-                                    url=job_url,
-                                    published_at=date,
-                                    position=position,
-                                    website=self.website,
-                                )
-                                job.set_linkedin_html(html, date, modality)
-                                jobs.append(job)
-
-                            except PWTimeout:
-                                continue
-                            except Exception:
-                                continue
-
-                        before = count
-                        self._scroll_results(page, max_scrolls=3)
-                        after = self._cards_locator(page).count()
-                        if after <= before:
-                            break
+        self._force_links_same_tab(page)
+        self._scroll_results(page, max_scrolls=10)
 
-            finally:
-                try:
-                    context.storage_state(path="state.json")
-                except Exception:
-                    pass
-                context.close()
-                browser.close()
+        # Se avanza por ID de oferta, no por índice: la lista es virtualizada y LinkedIn
+        # recicla los nodos al scrollear, así que un índice no identifica a una card
+        handled: set[str] = set()
+        while not page.is_closed():
+            ids = self._card_ids(self._cards_locator(page))
+            fresh = [job_id for job_id in dict.fromkeys(ids) if job_id and job_id not in handled]
+            if not fresh:
+                break
+            # Las ofertas ya guardadas en corridas anteriores no piden detalle (ni voyager ni click)
+            for job_id in fresh:
+                if seen_index.contains(self.website, job_id):
+                    handled.add(job_id)
+            fresh = [job_id for job_id in fresh if job_id not in handled]
+
+            # Primero lo que ya llegó como JSON; el click + DOM queda solo para el resto
+            if collector is not None:
+                for job in self._jobs_from_capture(page, position, collector, fresh, handled):
+                    yield job
+
+            for job_id in fresh:
+                if page.is_closed():
+                    break
+                if job_id in handled:
+                    continue
+                handled.add(job_id)
+                job = self._job_from_card(page, position, job_id)
+                if job is not None:
+                    yield job
+
+            self._scroll_results(page, max_scrolls=3)
+
+    def _job_from_card(self, page, position: Position, job_id: str) -> Optional[Job]:
+        if not job_id.isdigit():
+            return None
+        try:
+            card = page.locator(f"[data-occludable-job-id='{job_id}'], [data-job-id='{job_id}']").first
+            if card.count():
+                a = card.locator("a[href*='/jobs/view/']")
+                target = a.first if a.count() else card
+            else:
+                target = page.locator(f"a[href*='/jobs/view/'][href*='{job_id}']").first
+                if not target.count():
+                    return None  # el nodo ya se recicló
+            target.click(timeout=10_000)
+
+            ready = self.waits["detail"].wait(
+                lambda ms: page.wait_for_function(_DETAIL_READY_JS, arg=[job_id, DETAIL_TITLE_SELECTOR], timeout=ms),
+                (PWTimeout,),
+            )
+            if not ready:
+                return None
+
+            html = page.content()
+            soup = parse_detail(html)
+            job_url = self._extract_job_url(page, html, soup)
+            modality = self._guess_modality_from_detail(soup)
+            date = datetime.utcnow()
+
+            job = Job(
+                title="",
+                company="",
+                url=job_url,
+                published_at=date,
+                position=position,
+                website=self.website,
+            )
+            job.set_linkedin_html(html, date, modality, soup=soup)
+            return job
+
+        except PWTimeout:
+            return None
+        except Exception:
+            return None
+
+    def _card_ids(self, cards) -> List[str]:
+        try:
+            return cards.evaluate_all(_CARD_IDS_JS)
+        except Exception:
+            return []
+
+    def _jobs_from_capture(
+        self, page, position: Position, collector: VoyagerCollector, ids: List[str], handled: set[str]
+    ) -> Iterator[Job]:
+        csrf: Optional[str] = None
+        for job_id in ids:
+            if not job_id or job_id in handled:
+                continue
+            data = collector.get(job_id)
+            if not data or not data.get("title"):
+                continue
+            if not data.get("description") and self.ui_capture_details:
+                # Detalle por la API con la sesión del navegador: sin click ni render
+                csrf = csrf or self._csrf_token(page)
+                payload = self._fetch_posting_json(page, job_id, csrf)
+                if payload:
+                    collector.absorb(payload)
+                    data = collector.get(job_id) or data
+
+            job = Job(
+                title="",
+                company="",
+                url=f"https://www.linkedin.com/jobs/view/{job_id}/",
+                published_at=datetime.utcnow(),
+                position=position,
+                website=self.website,
+            )
+            job.set_linkedin_data(data, modality=self._modality_from_text(data.get("location") or ""))
+            handled.add(job_id)
+            yield job
 
-        return jobs
+    def _csrf_token(self, page) -> Optional[str]:
+        try:
+            for c in page.context.cookies("https://www.linkedin.com"):
+                if c.get("name") == "JSESSIONID":
+                    return c.get("value", "").strip('"')
+        except Exception:
+            pass
+        return None
+
+    def _fetch_posting_json(self, page, job_id: str, csrf: Optional[str]) -> Optional[dict]:
+        if not csrf:
+            return None
+        try:
+            resp = page.request.get(
+                VOYAGER_POSTING_URL.format(job_id=job_id),
+                headers={
+                    "csrf-token": csrf,
+                    "accept": "application/vnd.linkedin.normalized+json+2.1",
+                    "x-restli-protocol-version": "2.0.0",
+                },
+                timeout=10_000,
+            )
+            return resp.json() if resp.ok else None
+        except Exception:
+            return None
 
     def _build_search_url_ui(self, keywords: str) -> str:
         loc = f"geoId={self.location}" if self.location.isdigit() else f"location={self.location}"
@@ -157,7 +441,7 @@ class LinkedInSpider:
         except PWTimeout:
             pass
 
-        if any(k in page.url for k in ("login", "authwall", "checkpoint")):
+        if _on_login_wall(page.url):
             page.goto("https://www.linkedin.com/login", timeout=60_000)
             page.wait_for_selector("input#username", timeout=60_000)
             user = getattr(config, "LINKEDIN_USER", "")
@@ -166,59 +450,35 @@ class LinkedInSpider:
                 page.fill("input#username", user)
                 page.fill("input#password", pwd)
                 page.click("button[type='submit']")
-            for _ in range(120):
-                if page.is_closed():
-                    return
-                if not any(k in page.url for k in ("checkpoint", "authwall", "login")):
-                    break
-                page.wait_for_timeout(2000)
+            # Se espera la navegación fuera del login/checkpoint (hasta 4 min si hay que resolverlo a mano)
+            try:
+                page.wait_for_url(lambda url: not _on_login_wall(url), timeout=240_000)
+            except Exception:
+                pass
 
     def _accept_cookies(self, page):
-        for sel in (
-            "button[aria-label*='cookies' i]",
-            "button:has-text('Aceptar todas')",
-            "button:has-text('Aceptar todo')",
-            "button:has-text('Aceptar')",
-            "button:has-text('Accept all')",
-            "button:has-text('Accept')",
-            "button:has-text('I agree')",
-        ):
-            btn = page.locator(sel)
-            if btn.count():
-                try:
-                    btn.first.click()
-                    page.wait_for_timeout(400)
-                    break
-                except Exception:
-                    pass
+        # Una sola consulta para el caso común (banner ya aceptado en la sesión)
+        if not page.locator(", ".join(COOKIE_VARIANTS)).count():
+            return
+        sel = selector_cache.resolve("linkedin.cookies", COOKIE_VARIANTS, lambda v: page.locator(v).count() > 0)
+        if sel is None:
+            return
+        try:
+            btn = page.locator(sel).first
+            btn.click()
+            btn.wait_for(state="detached", timeout=2_000)
+        except Exception:
+            pass
 
     def _wait_results(self, page) -> bool:
-        try:
-            page.wait_for_selector(
-                ",".join([
-                    "ul.scaffold-layout__list-container li",
-                    "li.jobs-search-results__list-item",
-                    "li[data-occludable-job-id]",
-                    "[data-results-list]",
-                    "a[href*='/jobs/view/']"
-                ]),
-                timeout=25_000,
-            )
-            return True
-        except PWTimeout:
-            return False
+        return self.waits["results"].wait(
+            lambda ms: page.wait_for_selector(RESULTS_SELECTOR, timeout=ms),
+            (PWTimeout,),
+        )
 
     def _results_container(self, page):
-        for sel in (
-            "section.two-pane-serp-page__results-list",
-            "div.jobs-search-results-list",
-            "[data-results-list]",
-            "div.scaffold-layout__list",
-        ):
-            loc = page.locator(sel).first
-            if loc.count():
-                return loc
-        return page.locator("body")
+        sel = selector_cache.resolve("linkedin.container", CONTAINER_VARIANTS, lambda v: page.locator(v).count() > 0)
+        return page.locator(sel).first if sel else page.locator("body")
 
     def _force_links_same_tab(self, page):
         try:
@@ -226,20 +486,20 @@ class LinkedInSpider:
         except Exception:
             pass
 
+    def _card_selector(self, page) -> str:
+        sel = selector_cache.resolve("linkedin.cards", CARD_VARIANTS, lambda v: page.locator(v).count() > 0)
+        return sel or CARD_SELECTOR
+
     def _cards_locator(self, page):
-        return page.locator(
-            "li.jobs-search-results__list-item, "
-            "li[data-occludable-job-id], "
-            "ul.scaffold-layout__list-container li, "
-            "div.job-card-container--clickable"
-        )
+        return page.locator(self._card_selector(page))
 
     def _scroll_results(self, page, max_scrolls: int = 10):
         cont = self._results_container(page)
+        card_sel = self._card_selector(page)
         for _ in range(max_scrolls):
             if page.is_closed():
                 return
-            before = self._cards_locator(page).count()
+            before = page.locator(card_sel).count()
             try:
                 cont.evaluate("el => el.scrollBy(0, el.scrollHeight)")
             except Exception:
@@ -248,41 +508,61 @@ class LinkedInSpider:
                     page.keyboard.press("PageDown")
                 except Exception:
                     pass
-            page.wait_for_timeout(900)
-            after = self._cards_locator(page).count()
-            if after <= before:
+            # Se sigue apenas aparecen cards nuevas; si no llegan a tiempo, no hay más
+            grew = self.waits["scroll"].wait(
+                lambda ms: page.wait_for_function(_MORE_CARDS_JS, arg=[card_sel, before], timeout=ms),
+                (PWTimeout,),
+                miss_on_timeout=False,
+            )
+            if not grew:
                 break
 
-    def _extract_job_url(self, page, soup: BeautifulSoup) -> str:
-        canon = soup.select_one("link[rel='canonical']")
-        if canon and canon.get("href"):
-            return canon["href"].split("?")[0]
+    def _extract_job_url(self, page, html: str, soup: BeautifulSoup) -> str:
+        canon = canonical_url(html)
+        if canon:
+            return canon.split("?")[0]
         a = soup.select_one("a.base-card__full-link, a.topcard__button, a.topcard__org-name-link, a[href*='/jobs/view/']")
         if a and a.get("href") and a["href"].startswith("http"):
             return a["href"].split("?")[0]
+        # Vista de búsqueda logueada: el detalle abierto viene en ?currentJobId=
+        job_id = parse_qs(urlparse(page.url).query).get("currentJobId")
+        if job_id:
+            return f"https://www.linkedin.com/jobs/view/{job_id[0]}/"
         return page.url.split("?")[0]
 
     def _guess_modality_from_detail(self, soup: BeautifulSoup) -> Modality:
-        txt = soup.get_text(" ", strip=True).lower()
-        if "remoto" in txt or "remote" in txt:
-            return Modality.REMOTO
-        if "híbrido" in txt or "hibrido" in txt or "hybrid" in txt:
-            return Modality.HIBRIDO
-        return Modality.PRESENCIAL
+        # soup ya viene acotado a top card / criterios / descripción
+        return self._modality_from_text(soup.get_text(" ", strip=True))
+
+    def _modality_from_text(self, text: str) -> Modality:
+        return rules.modality(text) or Modality.PRESENCIAL
 
     # ---------- Guest ----------
 
-    def _run_guest(self) -> List[Job]:
-        jobs: List[Job] = []
-        for position in Position:
-            links = self._collect_links_guest(position)
-            for ln in links:
-                j = self._build_job_from_detail_guest(ln, position)
-                if j:
-                    jobs.append(j)
-        return jobs
-
-    def _collect_links_guest(self, position: Position) -> List[_Link]:
+    def _run_guest(self, skip: Optional[Set[str]] = None) -> Iterator[Job]:
+        return stream_async(partial(self._stream_guest, skip or set()))
+
+    async def _stream_guest(self, skip: Set[str]) -> AsyncIterator[Job]:
+        # Cada oferta va al detalle apenas sale en un listado, todas en un mismo pool (no uno
+        # por posición) y una sola vez aunque salga en varias posiciones
+        details = DetailQueue(self._build_job_from_detail_guest_async, mode="eager", concurrency=config.STREAM_WINDOW)
+        listings = map_unordered(self._position_links_guest, Position)
+        async for job_id, link, positions in offers_by_id(listings, lambda ln: linkedin_job_id(ln.url) or ln.url):
+            # Las ofertas ya guardadas en corridas anteriores no piden detalle
+            if f"{self.website.value}:{job_id}" in skip or seen_index.contains(self.website, job_id):
+                continue
+            details.add(link, positions)
+            for job in details.ready():
+                yield job
+
+        async for job in details.drain():
+            yield job
+
+    async def _position_links_guest(self, position: Position) -> Tuple[Position, List[_Link]]:
+        return position, await self._collect_links_guest_async(position)
+
+    async def _collect_links_guest_async(self, position: Position) -> List[_Link]:
+        # Las páginas van en serie: se corta en la primera vacía
         links: List[_Link] = []
         seen: set[str] = set()
         for page in range(self.max_pages):
@@ -293,7 +573,10 @@ class LinkedInSpider:
             }
             params["location"] = self.location if not self.location.isdigit() else "Chile"
             url = f"{BASE_GUEST}?{urlencode(params)}"
-            html = linkedin_fetch(url)
+            html = await linkedin_fetch_async(url)
+            if html is None:
+                # Página caída: last_run no debe avanzar como si se hubiera visto todo
+                crawl_state.page_failed(self.website)
             if not html:
                 break
             cards = self._parse_list_html_guest(html)
@@ -307,7 +590,7 @@ class LinkedInSpider:
         return links
 
     def _parse_list_html_guest(self, html: str) -> List[_Link]:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_list(html)
         out: List[_Link] = []
         for it in soup.select(".base-card, .job-search-card"):
             a = it.select_one("a.base-card__full-link, a.result-card__full-card-link")
@@ -341,15 +624,15 @@ class LinkedInSpider:
         return now
 
     def _extract_modality_hint(self, node) -> Modality:
-        text = node.get_text(" ", strip=True).lower()
-        if "remoto" in text or "remote" in text:
-            return Modality.REMOTO
-        if "híbrido" in text or "hibrido" in text or "hybrid" in text:
-            return Modality.HIBRIDO
-        return Modality.PRESENCIAL
+        return self._modality_from_text(node.get_text(" ", strip=True))
 
     def _build_job_from_detail_guest(self, link: _Link, position: Position) -> Optional[Job]:
-        html = linkedin_fetch(link.url)
+        return self._job_from_detail_html(linkedin_fetch(link.url), link, position)
+
+    async def _build_job_from_detail_guest_async(self, link: _Link, position: Position) -> Optional[Job]:
+        return self._job_from_detail_html(await linkedin_fetch_async(link.url), link, position)
+
+    def _job_from_detail_html(self, html: Optional[str], link: _Link, position: Position) -> Optional[Job]:
         if not html:
             return None
         job = Job(
@@ -364,6 +647,13 @@ class LinkedInSpider:
         return job
 
 
+def _block_unneeded(route):
+    req = route.request
+    if req.resource_type in BLOCKED_RESOURCE_TYPES or any(part in req.url for part in BLOCKED_URL_PARTS):
+        return route.abort()
+    return route.continue_()
+
+
 def _first_int(s: str) -> Optional[int]:
     buf = ""
     for ch in s:
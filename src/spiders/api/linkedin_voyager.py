@@ -0,0 +1,126 @@
+# src/spiders/api/linkedin_voyager.py
+"""
+Captura de los JSON que la UI logueada de LinkedIn pide por XHR (API "voyager").
+La lista de resultados y el detalle de cada oferta llegan como entidades normalizadas
+(`included`), así que se arma el Job sin tocar el DOM.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+VOYAGER_POSTING_URL = "https://www.linkedin.com/voyager/api/jobs/jobPostings/{job_id}"
+
+_JOB_ID_RE = re.compile(r"(\d{6,})")
+
+
+def is_job_payload(url: str) -> bool:
+    url = url.lower()
+    return "/voyager/api/" in url and "job" in url
+
+
+def _text(value: Any) -> Optional[str]:
+    # Los textos vienen como str o como {"text": "..."}
+    if isinstance(value, dict):
+        value = value.get("text")
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return None
+
+
+def _iter_entities(node: Any, depth: int = 0) -> Iterator[dict]:
+    if depth > 6:
+        return
+    if isinstance(node, dict):
+        urn = node.get("entityUrn") or node.get("*jobPosting") or ""
+        if isinstance(urn, str) and "jobPosting" in urn:
+            yield node
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _iter_entities(value, depth + 1)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_entities(item, depth + 1)
+
+
+def _company(entity: dict) -> Optional[str]:
+    name = _text(entity.get("companyName")) or _text(entity.get("primaryDescription"))
+    if name:
+        return name
+    details = entity.get("companyDetails") or {}
+    for value in details.values() if isinstance(details, dict) else ():
+        if isinstance(value, dict):
+            resolved = value.get("companyResolutionResult") or value
+            name = _text(resolved.get("name")) if isinstance(resolved, dict) else None
+            if name:
+                return name
+    return None
+
+
+def _listed_at(entity: dict) -> Optional[int]:
+    if isinstance(entity.get("listedAt"), int):
+        return entity["listedAt"]
+    for item in entity.get("footerItems") or ():
+        if isinstance(item, dict) and item.get("type") == "LISTED_DATE" and isinstance(item.get("timeAt"), int):
+            return item["timeAt"]
+    return None
+
+
+class VoyagerCollector:
+    """
+    Acumula, por ID de oferta, los campos vistos en las respuestas voyager de una página.
+    Se registra con page.on("response", collector.on_response).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def on_response(self, response):
+        if not is_job_payload(response.url):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            payload = response.json()
+        except Exception:
+            return
+        self.absorb(payload)
+
+    def absorb(self, payload: Any):
+        for entity in _iter_entities(payload):
+            self._merge(entity)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            data = self._postings.get(job_id)
+            return dict(data) if data else None
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+
+    def _merge(self, entity: dict):
+        urn = entity.get("entityUrn") or entity.get("*jobPosting") or ""
+        match = _JOB_ID_RE.search(str(entity.get("jobPostingId") or urn))
+        if not match:
+            return
+        job_id = match.group(1)
+
+        fields = {
+            "id": job_id,
+            "title": _text(entity.get("title")) or _text(entity.get("jobPostingTitle")),
+            "company": _company(entity),
+            "location": _text(entity.get("formattedLocation")) or _text(entity.get("secondaryDescription")),
+            "description": _text(entity.get("description")),
+            "listedAt": _listed_at(entity),
+            "employmentStatus": entity.get("employmentStatus") or entity.get("formattedEmploymentStatus"),
+            "workplaceTypes": entity.get("workplaceTypes"),
+        }
+        with self._lock:
+            current = self._postings.setdefault(job_id, {})
+            for key, value in fields.items():
+                if value:
+                    current[key] = value
@@ -1,29 +1,68 @@
 from datetime import datetime
 from classes.job import Job
+from utils import config
 from utils.enums import Position, Website
 from utils.fetch import trabajando_fetch
-from typing import List, Optional
+from utils.async_fetch import trabajando_fetch_async, gather_all, map_unordered, stream_async
+from utils.crawl_state import crawl_state, newest_first
+from utils.seen_index import seen_index
+from utils.detail_queue import DetailQueue, offers_by_id
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
 class TrabajandoSpider:
     def __init__(self):
-        self.base_url = 'https://www.trabajando.cl/api/searchjob?orden=RANKING'
+        self.base_url = f'https://www.trabajando.cl/api/searchjob?orden={config.TRABAJANDO_ORDER}'
         self.offer_base_url = 'https://www.trabajando.cl/api/ofertas/'
         self.job_base_url = 'https://www.trabajando.cl/trabajo-empleo/'
         self.headers = {
             'Referer': 'https://www.trabajando.cl/trabajo-empleo'
         }
 
-    def run(self) -> List[Job]:
-        all_jobs: List[Job] = []
+    def run(self) -> Iterator[Job]:
+        crawl_state.begin(Website.TRABAJANDO)
+        return crawl_state.track(stream_async(self._stream))
 
-        for position in Position:
-            pages = self.get_pages(position)
-            offers = [url for page in pages for url in self.get_offers(page)]
-            jobs = [job for url in offers for job in [self.get_job(url, position)] if job is not None]
+    async def _stream(self) -> AsyncIterator[Job]:
+        details = DetailQueue(self._get_job_async)
+        # Una oferta hallada bajo varias posiciones se arma y se detalla una sola vez
+        listings = map_unordered(self._position_offers, Position)
+        async for offer_id, offer, positions in offers_by_id(listings, lambda o: str(o["idOferta"])):
+            # Las ofertas ya guardadas en corridas anteriores no piden detalle
+            if seen_index.contains(Website.TRABAJANDO, offer_id):
+                continue
+            # El listado ya trae título, empresa, ubicación y fecha: el detalle queda para después
+            # (en modo eager no se arma job de listado: sale solo el job con detalle)
+            listing = None if details.eager else self._listing_job(offer, positions)
+            details.add(self._offer_url(offer), positions, listing)
+            for job in details.ready():
+                yield job
 
-            all_jobs.extend(jobs)
+        async for job in details.drain():
+            yield job
 
-        return all_jobs
+    async def _position_offers(self, position: Position) -> Tuple[Position, List[dict]]:
+        url = self._search_url(position)
+        pages = self._pages_from(url, await self._fetch_listing_async(url))
+
+        mark = crawl_state.mark(Website.TRABAJANDO, position)
+        # El corte por páginas supone más recientes primero; con RANKING se pide todo
+        if mark is None or config.TRABAJANDO_ORDER == "RANKING":
+            offer_lists = await gather_all(self._get_raw_offers_async(page) for page in pages)
+            return position, [o for offers in offer_lists for o in offers]
+
+        # Incremental: en orden, hasta la primera página que ya estaba completa
+        offers: List[dict] = []
+        for i, page in enumerate(pages):
+            raw = await self._get_raw_offers_async(page)
+            offers.extend(raw)
+            if not newest_first(self._offer_date(o) for o in offers):
+                # El orden pedido no resultó ser por fecha: el corte no es seguro
+                offer_lists = await gather_all(self._get_raw_offers_async(p) for p in pages[i + 1:])
+                offers.extend(o for rest in offer_lists for o in rest)
+                break
+            if not raw or all(mark.covers(self._offer_date(o), str(o.get("idOferta"))) for o in raw):
+                break
+        return position, offers
 
     def get_career_query(self, position: Position) -> str:
     # Como PUBLICISTA y otros no están definidos en tu enum, devolvemos string vacío
@@ -31,23 +70,72 @@ class TrabajandoSpider:
 
 
     def get_pages(self, position: Position) -> List[str]:
-        url = f"{self.base_url}&palabraClave={position.value}&{self.get_career_query(position)}"
-        data = trabajando_fetch(url, self.headers)
+        url = self._search_url(position)
+        return self._pages_from(url, trabajando_fetch(url, self.headers))
+
+    def get_offers(self, page: str) -> List[str]:
+        return self._offers_from(trabajando_fetch(page, self.headers))
+
+    def get_job(self, url: str, position: Position) -> Optional[Job]:
+        return self._job_from(trabajando_fetch(url, self.headers), position)
+
+    async def _get_raw_offers_async(self, page: str) -> List[dict]:
+        return [o for o in self._raw_offers(await self._fetch_listing_async(page)) if o.get("idOferta") is not None]
+
+    async def _fetch_listing_async(self, url: str) -> dict | None:
+        data = await trabajando_fetch_async(url, self.headers)
+        if data is None:
+            # Página caída: no es lo mismo que una vacía para las marcas incrementales
+            crawl_state.page_failed(Website.TRABAJANDO)
+        return data
+
+    async def _get_job_async(self, url: str, position: Position) -> Optional[Job]:
+        return self._job_from(await trabajando_fetch_async(url, self.headers), position)
+
+    def _search_url(self, position: Position) -> str:
+        return f"{self.base_url}&palabraClave={position.value}&{self.get_career_query(position)}"
+
+    def _pages_from(self, url: str, data: dict | None) -> List[str]:
         if data is None:
             return []
 
         total = data.get("cantidadPaginas", 0)
         return [f"{url}&pagina={i + 1}" for i in range(total)]
 
-    def get_offers(self, page: str) -> List[str]:
-        data = trabajando_fetch(page, self.headers)
+    def _offers_from(self, data: dict | None) -> List[str]:
+        return [self._offer_url(o) for o in self._raw_offers(data)]
+
+    def _raw_offers(self, data: dict | None) -> List[dict]:
         if data is None:
             return []
 
-        return [f"{self.offer_base_url}{o['idOferta']}" for o in data.get("ofertas", [])]
+        return data.get("ofertas", [])
 
-    def get_job(self, url: str, position: Position) -> Optional[Job]:
-        data = trabajando_fetch(url, self.headers)
+    def _offer_url(self, offer: dict) -> str:
+        return f"{self.offer_base_url}{offer['idOferta']}"
+
+    def _offer_date(self, offer: dict) -> Optional[datetime]:
+        raw = offer.get("fechaPublicacionFormatoIngles") or ""
+        try:
+            return datetime.strptime(raw[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+
+    def _listing_job(self, offer: dict, positions: List[Position]) -> Optional[Job]:
+        """Job desde una oferta del listado: la descripción (y la jornada si no viene) queda pendiente."""
+        published_at = self._offer_date(offer)
+        if not offer.get("nombreCargo") or published_at is None:
+            return None
+
+        job = self._job_from({**offer, "fechaPublicacionFormatoIngles": published_at.strftime("%Y-%m-%d")}, positions[0])
+        job.set_positions(positions)
+        pending = ["description"]
+        if not offer.get("nombreJornada"):
+            pending += ["type_", "modality"]
+        job.mark_pending(*pending)
+        return job
+
+    def _job_from(self, data: dict | None, position: Position) -> Optional[Job]:
         if data is None:
             return None
 
@@ -1,9 +1,14 @@
 # spiders/api/trabajoconsentido.py
+import asyncio
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from classes.job import Job
 from utils.enums import Website, Position
 from utils.fetch import trabajo_con_sentido_fetch
+from utils.async_fetch import trabajo_con_sentido_fetch_async, map_unordered, stream_async
+from utils.crawl_state import crawl_state
+from utils.seen_index import seen_index
+from utils.detail_queue import DetailQueue, offers_by_id
 
 class TrabajoConSentidoSpider:
     BASE_URL = "https://api.trabajoconsentido.com/offers"
@@ -12,16 +17,13 @@ class TrabajoConSentidoSpider:
 
     def __init__(self):
         self.headers = {}
+        # Listado sin filtro de la corrida en curso (fallback de las posiciones sin resultados)
+        self._fallback: Optional[asyncio.Future] = None
 
     # ---------- Public API ----------
-    def run(self) -> List[Job]:
-        jobs: List[Job] = []
-        for position in Position:
-            for offer_url in self.get_offer_urls(position):
-                job = self.get_job(offer_url, position)
-                if job:
-                    jobs.append(job)
-        return jobs
+    def run(self) -> Iterator[Job]:
+        crawl_state.begin(Website.TRABAJO_CON_SENTIDO)
+        return crawl_state.track(stream_async(self._stream))
 
     def get_offer_urls(self, position: Position) -> List[str]:
         """
@@ -35,16 +37,72 @@ class TrabajoConSentidoSpider:
         return self._fetch_offer_urls(self.BASE_URL)
 
     def get_job(self, detail_url: str, position: Position) -> Optional[Job]:
-        data = trabajo_con_sentido_fetch(detail_url, self.headers)
+        return self._job_from(trabajo_con_sentido_fetch(detail_url, self.headers), position)
+
+    # ---------- Internos ----------
+    async def _stream(self) -> AsyncIterator[Job]:
+        details = DetailQueue(self._get_job_async)
+        self._fallback = None
+        try:
+            # Una oferta hallada bajo varias posiciones (o en el fallback sin filtro) va una sola vez
+            listings = map_unordered(self._position_offers, Position)
+            async for slug, offer, positions in offers_by_id(listings, lambda o: o["slug"]):
+                # Las ofertas ya guardadas en corridas anteriores no piden detalle
+                if seen_index.contains(Website.TRABAJO_CON_SENTIDO, slug):
+                    continue
+                # Lo que el listado no trae (normalmente la descripción) se pide en la etapa de detalles
+                # (en modo eager no se arma job de listado: sale solo el job con detalle)
+                listing = None if details.eager else self._listing_job(offer, positions)
+                details.add(self._detail_url(offer), positions, listing)
+                for job in details.ready():
+                    yield job
+        finally:
+            self._fallback = None
+
+        async for job in details.drain():
+            yield job
+
+    async def _position_offers(self, position: Position) -> Tuple[Position, List[dict]]:
+        offers = await self._fetch_offers_async(self._list_url(position))
+        if not offers:
+            offers = await self._fallback_offers()
+        return position, offers
+
+    async def _fallback_offers(self) -> List[dict]:
+        # El listado sin filtro se pide y se parsea una vez por corrida, aunque caigan a él
+        # varias posiciones. shield: cancelar una posición no cancela la descarga compartida
+        if self._fallback is None:
+            self._fallback = asyncio.ensure_future(self._fetch_offers_async(self.BASE_URL))
+        return await asyncio.shield(self._fallback)
+
+    async def _get_job_async(self, detail_url: str, position: Position) -> Optional[Job]:
+        return self._job_from(await trabajo_con_sentido_fetch_async(detail_url, self.headers), position)
+
+    def _job_from(self, data: dict | None, position: Position) -> Optional[Job]:
         if not data:
             return None
 
         offer = ((data.get("content") or {}).get("offer") or {})
-        slug = offer.get("slug")
-        if not slug:
+        if not offer.get("slug"):
+            return None
+        return self._job_from_offer(offer, position)
+
+    def _listing_job(self, offer: dict, positions: List[Position]) -> Optional[Job]:
+        """Job desde una oferta del listado; lo que falte queda pendiente del detalle."""
+        if not offer.get("title") or not offer.get("moderatedAt"):
             return None
 
-        product_url = f"{self.JOB_BASE_URL}{slug}"
+        job = self._job_from_offer(offer, positions[0])
+        job.set_positions(positions)
+        job.mark_pending(*(
+            field
+            for field, key in (("description", "description"), ("type_", "workingDay"), ("modality", "workingMode"))
+            if not offer.get(key)
+        ))
+        return job
+
+    def _job_from_offer(self, offer: dict, position: Position) -> Job:
+        product_url = f"{self.JOB_BASE_URL}{offer['slug']}"
         job = Job(
             title=offer.get("title", ""),
             company=(offer.get("organization") or {}).get("name", ""),
@@ -56,11 +114,25 @@ class TrabajoConSentidoSpider:
         job.set_trabajo_con_sentido_data(offer)
         return job
 
-    # ---------- Internos ----------
     def _list_url(self, position: Position) -> str:
         return f"{self.BASE_URL}?tags={position.value.replace(' ', ',')}"
 
     def _fetch_offer_urls(self, page_url: str) -> List[str]:
-        data = trabajo_con_sentido_fetch(page_url, self.headers)
+        return self._offer_urls_from(trabajo_con_sentido_fetch(page_url, self.headers))
+
+    async def _fetch_offers_async(self, page_url: str) -> List[dict]:
+        data = await trabajo_con_sentido_fetch_async(page_url, self.headers)
+        if data is None:
+            # Listado caído: no es lo mismo que uno vacío para las marcas incrementales
+            crawl_state.page_failed(Website.TRABAJO_CON_SENTIDO)
+        return self._raw_offers(data)
+
+    def _offer_urls_from(self, data: dict | None) -> List[str]:
+        return [self._detail_url(o) for o in self._raw_offers(data)]
+
+    def _raw_offers(self, data: dict | None) -> List[dict]:
         offers = (data or {}).get("content", {}).get("offers", []) or []
-        return [f"{self.OFFER_BASE_URL}/{o['slug']}" for o in offers if isinstance(o, dict) and o.get("slug")]
+        return [o for o in offers if isinstance(o, dict) and o.get("slug")]
+
+    def _detail_url(self, offer: dict) -> str:
+        return f"{self.OFFER_BASE_URL}/{offer['slug']}"
@@ -3,7 +3,7 @@ from pprint import pprint
 
 if __name__ == "__main__":
     spider = LaborumSpider()
-    jobs = spider.run()
+    jobs = list(spider.run())
 
     print(f"Found {len(jobs)} jobs")
     for job in jobs[:5]:  # Mostrar solo los primeros 5
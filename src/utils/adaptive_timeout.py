@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Callable, Tuple, Type
+
+
+class AdaptiveTimeout:
+    """
+    Timeout que sigue la latencia observada: EWMA de lo que tardan las esperas que
+    terminan bien, por un factor de holgura, acotado a [floor, ceiling] (en segundos).
+    Un timeout empuja la estimación hacia arriba para no cortar de más si el sitio se puso lento.
+    """
+
+    def __init__(self, initial: float, floor: float, ceiling: float, factor: float = 3.0, alpha: float = 0.2):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.factor = factor
+        self.alpha = alpha
+        self._ewma = initial / factor
+        self._lock = threading.Lock()
+
+    @property
+    def seconds(self) -> float:
+        with self._lock:
+            return min(self.ceiling, max(self.floor, self._ewma * self.factor))
+
+    @property
+    def ms(self) -> int:
+        return int(self.seconds * 1000)
+
+    def observe(self, elapsed: float):
+        with self._lock:
+            self._ewma += self.alpha * (elapsed - self._ewma)
+
+    def miss(self):
+        with self._lock:
+            # El próximo timeout efectivo queda 1.5x el que no alcanzó
+            effective = max(self._ewma, self.floor / self.factor)
+            self._ewma = min(self.ceiling / self.factor, effective * 1.5)
+
+    def wait(
+        self,
+        fn: Callable[[int], object],
+        timeout_errors: Tuple[Type[BaseException], ...],
+        miss_on_timeout: bool = True,
+    ) -> bool:
+        """
+        Llama fn(timeout_ms); True si terminó a tiempo (y se registra cuánto tardó),
+        False si lanzó alguno de timeout_errors. miss_on_timeout=False para esperas
+        donde el timeout es el final esperado (p. ej. no hay más resultados).
+        """
+        start = time.monotonic()
+        try:
+            fn(self.ms)
+        except timeout_errors:
+            if miss_on_timeout:
+                self.miss()
+            return False
+        self.observe(time.monotonic() - start)
+        return True
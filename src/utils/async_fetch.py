@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from utils import config
+from utils.session import site_for
+from utils.fetch import laborum_fetch, trabajando_fetch, trabajo_con_sentido_fetch, linkedin_fetch
+from utils.request_memo import request_memo
+from utils.threaded_queue import ThreadedQueue
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Un juego de semáforos por event loop (cada spider hace su propio asyncio.run)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limit_for(host: str) -> int:
+    if host == "linkedin.com":
+        return max(1, config.LINKEDIN_FETCH_CONCURRENCY)
+    return max(1, config.FETCH_CONCURRENCY)
+
+
+def _semaphore(url: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    host = site_for(url)
+    sem = per_loop.get(host)
+    if sem is None:
+        sem = per_loop[host] = asyncio.Semaphore(_limit_for(host))
+    return sem
+
+
+async def _bounded(url: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # Los helpers de fetch son bloqueantes: se ejecutan en hilos, acotados por host
+    async with _semaphore(url):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _memoized(method: str, url: str, body: Any, fn: Callable[..., T], *args: Any) -> T:
+    # El memo va antes del semáforo: un pedido repetido espera sin tomar cupo del sitio
+    return await request_memo.call(request_memo.key(method, url, body), lambda: _bounded(url, fn, *args))
+
+
+async def laborum_fetch_async(url: str, headers: dict, body: dict, timeout: float = 15) -> dict | None:
+    return await _memoized("POST", url, body, laborum_fetch, url, dict(headers), body, timeout)
+
+
+async def trabajando_fetch_async(url: str, headers: dict, timeout: int = 10, retries: int = 2) -> dict | None:
+    return await _memoized("GET", url, None, trabajando_fetch, url, dict(headers or {}), timeout, retries)
+
+
+async def trabajo_con_sentido_fetch_async(url: str, headers: dict) -> dict | None:
+    return await _memoized("GET", url, None, trabajo_con_sentido_fetch, url, dict(headers))
+
+
+async def linkedin_fetch_async(url: str, retries: int = 3, timeout: int = 20) -> Optional[str]:
+    return await _memoized("GET", url, None, linkedin_fetch, url, retries, timeout)
+
+
+async def gather_all(aws: Iterable[Awaitable[T]]) -> List[T]:
+    return list(await asyncio.gather(*aws))
+
+
+async def map_unordered(
+    fn: Callable[[T], Awaitable[R]], items: Iterable[T], limit: Optional[int] = None
+) -> AsyncIterator[R]:
+    """
+    Aplica fn a cada item con a lo más `limit` en vuelo y entrega los resultados
+    según terminan. Mientras el consumidor no pide el siguiente, no se lanza nada nuevo.
+    """
+    limit = limit or config.STREAM_WINDOW
+    it = iter(items)
+    pending: set[asyncio.Task] = set()
+    try:
+        while True:
+            while len(pending) < limit:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                pending.add(asyncio.ensure_future(fn(item)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def stream_async(make_stream: Callable[[], AsyncIterator[T]], maxsize: Optional[int] = None) -> Iterator[T]:
+    """
+    Expone un async generator como generador síncrono. El loop corre en un hilo aparte
+    y publica en una cola acotada: si el consumidor (p. ej. Mongo) se atrasa, el crawl espera.
+    """
+    out: ThreadedQueue[T] = ThreadedQueue(maxsize or config.STREAM_WINDOW)
+
+    async def produce():
+        async for item in make_stream():
+            if not await asyncio.to_thread(out.put, item):
+                return
+
+    def worker():
+        with out.producer():
+            asyncio.run(produce())
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        yield from out.drain()
+    finally:
+        out.close()
+        thread.join(timeout=5)
@@ -26,3 +26,115 @@ LINKEDIN_MAX_PAGES = int(os.getenv("LINKEDIN_MAX_PAGES", "6"))
 # --- otros opcionales ---
 LINKEDIN_MIN_PUNCTUATION = int(os.getenv("LINKEDIN_MIN_PUNCTUATION", "0"))
 EMAIL_SENT = os.getenv("EMAIL_SENT", "")
+
+# --- red ---
+# Peticiones simultáneas por sitio (LinkedIn aparte: bloquea rápido)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+LINKEDIN_FETCH_CONCURRENCY = int(os.getenv("LINKEDIN_FETCH_CONCURRENCY", "3"))
+
+# Pool keep-alive por sitio y reintentos de conexión / 5xx
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", str(FETCH_CONCURRENCY)))
+LINKEDIN_HTTP_POOL_SIZE = int(os.getenv("LINKEDIN_HTTP_POOL_SIZE", str(LINKEDIN_FETCH_CONCURRENCY)))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+
+# Limitador adaptativo (peticiones/segundo por sitio) y circuit breaker
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "5"))
+LINKEDIN_THROTTLE_RATE = float(os.getenv("LINKEDIN_THROTTLE_RATE", "1"))
+THROTTLE_MIN_RATE = float(os.getenv("THROTTLE_MIN_RATE", "0.1"))
+THROTTLE_MAX_RATE = float(os.getenv("THROTTLE_MAX_RATE", "20"))
+THROTTLE_INCREASE = float(os.getenv("THROTTLE_INCREASE", "0.2"))
+THROTTLE_DECREASE = float(os.getenv("THROTTLE_DECREASE", "0.5"))
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "8"))
+BREAKER_MAX_WAIT = float(os.getenv("BREAKER_MAX_WAIT", "300"))
+
+# Streaming spiders -> Mongo: tareas en vuelo / jobs en cola y tamaño de lote de escritura
+STREAM_WINDOW = int(os.getenv("STREAM_WINDOW", "32"))
+SAVE_BATCH_SIZE = int(os.getenv("SAVE_BATCH_SIZE", "100"))
+SAVE_FLUSH_SECONDS = float(os.getenv("SAVE_FLUSH_SECONDS", "5"))
+
+# --- corridas incrementales ---
+# High-water marks por sitio/posición; INCREMENTAL_CRAWL=0 fuerza un crawl completo
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", "crawl_state.json")
+INCREMENTAL_CRAWL = os.getenv("INCREMENTAL_CRAWL", "1").lower() in ("1", "true", "yes")
+# Índice local de ofertas ya guardadas: se salta su fetch de detalle
+SEEN_INDEX_PATH = os.getenv("SEEN_INDEX_PATH", "seen_index.sqlite3")
+SKIP_SEEN_OFFERS = os.getenv("SKIP_SEEN_OFFERS", "1").lower() in ("1", "true", "yes")
+
+# Orden del listado de Trabajando. Con RANKING (por defecto) no se corta por páginas en
+# corridas incrementales: solo un orden por fecha (más recientes primero) lo hace seguro
+TRABAJANDO_ORDER = os.getenv("TRABAJANDO_ORDER", "RANKING")
+
+# --- detalle de ofertas (Trabajando / Trabajo con Sentido) ---
+# DETAIL_MODE: lazy (job desde el listado, detalles en una etapa al final) | eager (un detalle
+# por oferta apenas se lista) | skip (solo listados; el detalle solo si el listado no alcanza)
+DETAIL_MODE = os.getenv("DETAIL_MODE", "lazy")
+# Tope de detalles por spider y corrida (0 = sin tope; los más recientes primero) y cuántos en vuelo
+DETAIL_LIMIT = int(os.getenv("DETAIL_LIMIT", "0"))
+DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "0"))
+
+# Single-flight: pedidos idénticos (URL + body) simultáneos salen una sola vez a la red.
+# No guarda respuestas: un pedido repetido después lo sirve http_cache (si está activo)
+REQUEST_MEMO = os.getenv("REQUEST_MEMO", "1").lower() in ("1", "true", "yes")
+
+# --- caché HTTP ---
+# HTTP_CACHE_MODE: on | off | replay (replay nunca sale a la red)
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "on")
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "http_cache.sqlite3")
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "3600"))
+# TTL por sitio, p. ej. "linkedin.com=900,laborum.cl=1800"
+HTTP_CACHE_TTLS = {
+    site.strip(): int(ttl)
+    for site, _, ttl in (item.partition("=") for item in os.getenv("HTTP_CACHE_TTLS", "").split(","))
+    if site.strip() and ttl.strip()
+}
+
+# --- LinkedIn UI (Playwright) ---
+# Navegadores en paralelo; cada uno toma posiciones de una cola común
+LINKEDIN_UI_WORKERS = int(os.getenv("LINKEDIN_UI_WORKERS", "3"))
+# Armar jobs desde el JSON que la UI pide por XHR (click + DOM solo como respaldo)
+LINKEDIN_UI_CAPTURE = os.getenv("LINKEDIN_UI_CAPTURE", "1").lower() in ("1", "true", "yes")
+LINKEDIN_UI_CAPTURE_DETAILS = os.getenv("LINKEDIN_UI_CAPTURE_DETAILS", "1").lower() in ("1", "true", "yes")
+# Navegador persistente (python browser_server.py): si LINKEDIN_CDP_URL está definido,
+# el spider se conecta por CDP en vez de lanzar Chromium y reloguearse en cada corrida
+LINKEDIN_CDP_URL = os.getenv("LINKEDIN_CDP_URL", "")
+LINKEDIN_CDP_PORT = int(os.getenv("LINKEDIN_CDP_PORT", "9222"))
+LINKEDIN_USER_DATA_DIR = os.getenv("LINKEDIN_USER_DATA_DIR", ".linkedin-profile")
+# Qué variante de selector anduvo con el layout actual (se prueba primero en la próxima corrida)
+SELECTOR_CACHE_PATH = os.getenv("SELECTOR_CACHE_PATH", "selector_cache.json")
+
+# --- export ---
+# Lote del cursor de Mongo al exportar y marca del último export incremental
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+EXPORT_STATE_PATH = os.getenv("EXPORT_STATE_PATH", "export_state.json")
+# EXPORT_FORMAT=ndjson|parquet: carpeta destino, filas por archivo y partición por fecha (day|month)
+EXPORT_DIR = os.getenv("EXPORT_DIR", "export")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+EXPORT_PARTITION = os.getenv("EXPORT_PARTITION", "day")
+
+# --- duplicados entre sitios (MinHash / LSH) ---
+# Cambiar NUM_PERM o BANDS obliga a recalcular firmas: python dedup.py
+DEDUP_AT_INGEST = os.getenv("DEDUP_AT_INGEST", "1").lower() in ("1", "true", "yes")
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+# --- búsqueda ---
+# Índice invertido (terms / title_terms) al guardar; lo previo se indexa con: python search.py --reindex
+SEARCH_INDEX_AT_INGEST = os.getenv("SEARCH_INDEX_AT_INGEST", "1").lower() in ("1", "true", "yes")
+# Candidatos (los más recientes que calzan) que se rankean por consulta
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "500"))
+
+# --- descripciones ---
+# Se guardan normalizadas, comprimidas y una sola vez por contenido (colección descriptions)
+DESCRIPTION_STORE = os.getenv("DESCRIPTION_STORE", "1").lower() in ("1", "true", "yes")
+DESCRIPTION_ZLIB_LEVEL = int(os.getenv("DESCRIPTION_ZLIB_LEVEL", "6"))
+
+# --- Laborum ---
+# Orden de searchV2; el corte incremental por páginas necesita los más recientes primero
+LABORUM_SORT = os.getenv("LABORUM_SORT", "RECIENTES")
+# Avisos por página pedidos a searchV2 (si la API lo ignora, se usa el `size` que devuelve)
+LABORUM_PAGE_SIZE = int(os.getenv("LABORUM_PAGE_SIZE", "100"))
+# Timeout de cada request a searchV2 (conexión y lectura); una página que lo excede cuenta como caída
+LABORUM_TIMEOUT = float(os.getenv("LABORUM_TIMEOUT", "15"))
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from utils import config
+from utils.enums import Position, Website
+
+
+@dataclass
+class Mark:
+    """Oferta más reciente ya guardada para un (sitio, posición)."""
+    published_at: datetime
+    id: Optional[str] = None
+
+    def covers(self, published_at: Optional[datetime], source_id: Optional[str] = None) -> bool:
+        # Fechas de Laborum/Trabajando son por día: el mismo día NO se considera viejo
+        if source_id is not None and source_id == self.id:
+            return True
+        return published_at is not None and published_at < self.published_at
+
+
+def newest_first(dates: Iterable[Optional[datetime]]) -> bool:
+    """
+    Listado ordenado de más reciente a más antiguo (sin fecha no cuenta). El corte
+    "hasta la primera página ya cubierta" solo es seguro si esto se cumple.
+    """
+    known = [d for d in dates if d is not None]
+    return all(a >= b for a, b in zip(known, known[1:]))
+
+
+class CrawlState:
+    """
+    High-water marks por (sitio, posición) y fecha de la última corrida exitosa por sitio,
+    persistidos en un JSON. Lo observado en la corrida queda pendiente hasta commit(),
+    que se llama recién cuando los jobs ya están guardados.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or config.CRAWL_STATE_PATH
+        self.enabled = config.INCREMENTAL_CRAWL if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Dict[str, Mark]] = {}
+        self._last_run: Dict[str, datetime] = {}
+        self._pending: Dict[str, Dict[str, Mark]] = {}
+        self._started: Dict[str, datetime] = {}
+        # Páginas de listado que no se pudieron bajar en la corrida, por sitio
+        self._failed: Dict[str, int] = {}
+        self._load()
+
+    # ---------- lectura ----------
+    def mark(self, site: Website, position: Position) -> Optional[Mark]:
+        if not self.enabled:
+            return None
+        return self._marks.get(site.value, {}).get(position.value)
+
+    def last_run(self, site: Website) -> Optional[datetime]:
+        if not self.enabled:
+            return None
+        return self._last_run.get(site.value)
+
+    def window_seconds(self, site: Website, default: int, margin: int = 3600) -> int:
+        """
+        Segundos desde la última corrida exitosa (+ margen), para filtros tipo f_TPR.
+        """
+        last = self.last_run(site)
+        if last is None:
+            return default
+        elapsed = (datetime.utcnow() - last).total_seconds()
+        return max(margin, int(elapsed) + margin)
+
+    # ---------- escritura ----------
+    def begin(self, site: Website):
+        with self._lock:
+            self._started.setdefault(site.value, datetime.utcnow())
+
+    def page_failed(self, site: Website):
+        """
+        Un listado no se pudo bajar (replay sin copia, error, timeout, circuito abierto):
+        la corrida de ese sitio queda incompleta y commit() no le avanza nada.
+        """
+        with self._lock:
+            self._failed[site.value] = self._failed.get(site.value, 0) + 1
+
+    def observe(self, site: Website, position: Position, published_at: Optional[datetime], source_id: Optional[str]):
+        if published_at is None:
+            return
+        with self._lock:
+            marks = self._pending.setdefault(site.value, {})
+            current = marks.get(position.value) or self.mark(site, position)
+            if current is None or published_at > current.published_at:
+                marks[position.value] = Mark(published_at, source_id)
+
+    def track(self, jobs: Iterable) -> Iterator:
+        """
+        Deja pasar el stream de Job registrando el más reciente por (sitio, posición),
+        en cada posición bajo la que apareció. Un job con campos pendientes no mueve la
+        marca (igual que en seen_index): la próxima corrida lo vuelve a listar y a ofrecer
+        a la etapa de detalles.
+        """
+        for job in jobs:
+            if not job.hydrated:
+                yield job
+                continue
+            for position in job.positions:
+                self.observe(job.website, position, job.published_at, job.source_id)
+            yield job
+
+    def commit(self, sites: Optional[Set[Website]] = None) -> Dict[str, int]:
+        """
+        Confirma lo observado. Un sitio con páginas de listado caídas no avanza marcas ni
+        last_run: lo que había en esas páginas contaría como visto para siempre.
+        Devuelve {sitio: páginas caídas} de los que quedaron sin confirmar.
+        """
+        with self._lock:
+            names = {s.value for s in sites} if sites else set(self._started) | set(self._pending)
+            skipped = {}
+            for name in names:
+                pending = self._pending.pop(name, {})
+                started = self._started.pop(name, None)
+                failed = self._failed.pop(name, 0)
+                if failed:
+                    skipped[name] = failed
+                    continue
+                for position, mark in pending.items():
+                    saved = self._marks.setdefault(name, {}).get(position)
+                    if saved is None or mark.published_at >= saved.published_at:
+                        self._marks[name][position] = mark
+                if started is not None:
+                    self._last_run[name] = started
+            self._save()
+            return skipped
+
+    def rollback(self):
+        with self._lock:
+            self._pending.clear()
+            self._started.clear()
+            self._failed.clear()
+
+    # ---------- persistencia ----------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        for site, marks in (raw.get("marks") or {}).items():
+            self._marks[site] = {
+                pos: Mark(datetime.fromisoformat(m["published_at"]), m.get("id"))
+                for pos, m in marks.items()
+            }
+        for site, ts in (raw.get("last_run") or {}).items():
+            self._last_run[site] = datetime.fromisoformat(ts)
+
+    def _save(self):
+        raw = {
+            "marks": {
+                site: {pos: {"published_at": m.published_at.isoformat(), "id": m.id} for pos, m in marks.items()}
+                for site, marks in self._marks.items()
+            },
+            "last_run": {site: ts.isoformat() for site, ts in self._last_run.items()},
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(raw, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+crawl_state = CrawlState()
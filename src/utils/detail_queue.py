@@ -0,0 +1,174 @@
+import asyncio
+import copy
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from classes.job import Job
+from utils import config
+from utils.async_fetch import map_unordered
+from utils.enums import Position
+
+MODES = ("lazy", "eager", "skip")
+_POSITION_ORDER = {p: i for i, p in enumerate(Position)}
+
+O = TypeVar("O")
+
+
+async def offers_by_id(
+    listings: AsyncIterator[Tuple[Position, List[O]]], offer_id: Callable[[O], str]
+) -> AsyncIterator[Tuple[str, O, List[Position]]]:
+    """
+    Junta los listados de todas las posiciones y entrega cada oferta una sola vez, apenas
+    termina el primer listado donde aparece. Su lista de posiciones (en el orden del enum)
+    sigue creciendo si la oferta reaparece en un listado posterior: DetailQueue la guarda
+    y al final vuelve a entregar las que sumaron posiciones.
+    """
+    offers: Dict[str, List[Position]] = {}
+    async for position, found in listings:
+        for offer in found:
+            key = offer_id(offer)
+            positions = offers.get(key)
+            if positions is None:
+                positions = offers[key] = [position]
+                yield key, offer, positions
+            elif position not in positions:
+                positions.append(position)
+                positions.sort(key=_POSITION_ORDER.__getitem__)
+
+
+@dataclass
+class PendingDetail:
+    # Lo que recibe fetch: la URL del detalle (o lo que el spider necesite para pedirlo)
+    target: Any
+    positions: Sequence[Position]
+    # Job armado desde el listado; None si el listado no alcanzó para armarlo
+    listing: Optional[Job] = None
+    # Si espera la etapa de detalles de drain() (modos lazy y skip)
+    queued: bool = False
+    # Último job entregado y con cuántas posiciones salió
+    sent: Optional[Job] = None
+    sent_positions: int = 0
+
+
+class DetailQueue:
+    """
+    Etapa de detalles. En modo lazy el spider entrega el job armado desde el listado
+    (sale por ready()) y encola acá su detalle; al terminar los listados, drain() pide
+    los detalles: primero los que no tienen job de listado, luego los más recientes,
+    a lo más `limit` y con `concurrency` en vuelo. En modo skip solo se piden los
+    imprescindibles (sin job de listado). En modo eager no hay jobs de listado: cada
+    detalle se pide apenas se agrega y el job sale ya completo por ready(), sin tope.
+    Una oferta que suma posiciones después de entregada vuelve a salir en drain().
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any, Position], Awaitable[Optional[Job]]],
+        mode: Optional[str] = None,
+        limit: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.mode = mode or config.DETAIL_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"DETAIL_MODE inválido: {self.mode} (usar {', '.join(MODES)})")
+        self.limit = config.DETAIL_LIMIT if limit is None else limit
+        self.concurrency = config.DETAIL_CONCURRENCY if concurrency is None else concurrency
+        self._fetch = fetch
+        self._items: List[PendingDetail] = []
+        self._ready: List[Job] = []
+        # Modo eager: detalles en vuelo y los ya llegados, a la espera de ready()
+        self._running: Set["asyncio.Task[Tuple[PendingDetail, Optional[Job]]]"] = set()
+        self._finished: List["asyncio.Task[Tuple[PendingDetail, Optional[Job]]]"] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def eager(self) -> bool:
+        return self.mode == "eager"
+
+    def add(self, target: Any, positions: Sequence[Position], listing: Optional[Job] = None):
+        item = PendingDetail(target, positions, None if self.eager else listing)
+        self._items.append(item)
+        if self.eager:
+            self._start(item)
+            return
+        if item.listing is not None:
+            self._send(item, item.listing)
+        item.queued = item.listing is None or not (item.listing.hydrated or self.mode == "skip")
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def ready(self) -> List[Job]:
+        """Jobs que ya se pueden entregar: los de listado y los detalles ya llegados (eager)."""
+        finished, self._finished = self._finished, []
+        for task in finished:
+            item, job = task.result()
+            if job is not None:
+                self._send(item, job)
+        ready, self._ready = self._ready, []
+        return ready
+
+    def _send(self, item: PendingDetail, job: Job):
+        job.set_positions(item.positions)
+        item.sent, item.sent_positions = job, len(job.positions)
+        self._ready.append(job)
+
+    def _start(self, item: PendingDetail):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency or config.STREAM_WINDOW)
+        task = asyncio.ensure_future(self._fetch_bounded(item))
+        self._running.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: "asyncio.Task[Tuple[PendingDetail, Optional[Job]]]"):
+        self._running.discard(task)
+        self._finished.append(task)
+
+    async def _fetch_bounded(self, item: PendingDetail) -> Tuple[PendingDetail, Optional[Job]]:
+        async with self._slots:
+            return await self._fetch_one(item)
+
+    def _ordered(self, items: List[PendingDetail]) -> List[PendingDetail]:
+        queued = [item for item in items if item.queued]
+        required = [item for item in queued if item.listing is None]
+        optional = sorted(
+            (item for item in queued if item.listing is not None),
+            key=lambda item: item.listing.published_at or datetime.min,
+            reverse=True,
+        )
+        if self.limit:
+            optional = optional[: self.limit]
+        return required + optional
+
+    async def drain(self) -> AsyncIterator[Job]:
+        """
+        Se llama al terminar los listados: entrega los detalles que faltan y, por cada
+        oferta entregada antes de sumar posiciones, una copia de su último job con todas
+        (el upsert solo agrega posiciones).
+        """
+        items, self._items = self._items, []
+        try:
+            while self._running or self._finished:
+                if not self._finished:
+                    await asyncio.wait(set(self._running), return_when=asyncio.FIRST_COMPLETED)
+                for job in self.ready():
+                    yield job
+        finally:
+            for task in self._running:
+                task.cancel()
+
+        async for item, job in map_unordered(self._fetch_one, self._ordered(items), self.concurrency or None):
+            if job is not None:
+                self._send(item, job)
+                for job in self.ready():
+                    yield job
+
+        for item in items:
+            if item.sent is not None and len(item.positions) > item.sent_positions:
+                job = copy.copy(item.sent)
+                job.set_positions(item.positions)
+                yield job
+
+    async def _fetch_one(self, item: PendingDetail) -> Tuple[PendingDetail, Optional[Job]]:
+        return item, await self._fetch(item.target, item.positions[0])
@@ -0,0 +1,12 @@
+import os
+from datetime import datetime
+from typing import List, Optional
+
+
+def env_list(name: str) -> List[str]:
+    return [s.strip().lower() for s in os.getenv(name, "").split(",") if s.strip()]
+
+
+def env_date(name: str) -> Optional[datetime]:
+    value = os.getenv(name, "").strip()
+    return datetime.fromisoformat(value) if value else None
@@ -1,21 +1,65 @@
 import requests
 import time
 import random
-import requests
 from utils.agent import random_user_agent
+from utils.session import get_session, site_for
+from utils.throttle import throttle, CircuitOpenError
+from utils.http_cache import http_cache
 from typing import Optional
 
 
+def send(method: str, url: str, **kwargs) -> Optional[requests.Response]:
+    """
+    Punto único de salida a la red: caché en disco, turno del limitador del sitio,
+    petición por la sesión con pool y registro del status para ajustar la tasa.
+    Devuelve None si el circuito del sitio está abierto o si en modo replay no hay copia.
+    """
+    site = site_for(url)
+    key = cached = None
+    if http_cache.enabled:
+        key = http_cache.key(method, url, kwargs.get("json", kwargs.get("data")))
+        cached = http_cache.get(key)
+        if cached is not None and (http_cache.replay or http_cache.is_fresh(cached, site)):
+            return cached.to_response()
+        if http_cache.replay:
+            return None
+        if cached is not None:
+            # Copia vencida: se revalida en vez de descargar de nuevo
+            headers = dict(kwargs.get("headers") or {})
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+            kwargs["headers"] = headers
+
+    try:
+        throttle.acquire(site)
+    except CircuitOpenError:
+        return None
+    resp = get_session(url).request(method, url, **kwargs)
+    throttle.record(site, resp.status_code, resp.headers.get("Retry-After"))
+
+    if key is not None:
+        if resp.status_code == 304 and cached is not None:
+            http_cache.refresh(key)
+            return cached.to_response()
+        if resp.status_code == 200:
+            http_cache.put(key, site, resp)
+    return resp
+
 
-def laborum_fetch(url: str, headers: dict, body: dict) -> dict | None:
+def laborum_fetch(url: str, headers: dict, body: dict, timeout: float = 15) -> dict | None:
     headers['User-Agent'] = random_user_agent()
+    response = None
     try:
-        response = requests.post(url, json=body, headers=headers)
+        response = send("POST", url, json=body, headers=headers, timeout=timeout)
+        if response is None:
+            return None
         response.raise_for_status()
         return response.json()
     except Exception as e:
         print("Error in fetching data from Laborum:", url)
-        print("Status code:", response.status_code if 'response' in locals() else 'unknown')
+        print("Status code:", response.status_code if response is not None else 'unknown')
         return None
 
 
@@ -31,7 +75,9 @@ def trabajando_fetch(url: str, headers: dict, timeout: int = 10, retries: int =
 
     for attempt in range(retries + 1):
         try:
-            resp = requests.get(url, headers=headers, timeout=timeout)
+            resp = send("GET", url, headers=headers, timeout=timeout)
+            if resp is None:
+                return None
             resp.raise_for_status()
             return resp.json()
         except (requests.Timeout, requests.ConnectionError) as e:
@@ -51,7 +97,9 @@ def trabajo_con_sentido_fetch(url: str, headers: dict) -> dict | None:
     headers['User-Agent'] = agent
 
     try:
-        response = requests.get(url, headers=headers)
+        response = send("GET", url, headers=headers)
+        if response is None:
+            return None
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -61,7 +109,7 @@ def trabajo_con_sentido_fetch(url: str, headers: dict) -> dict | None:
 def linkedin_fetch(url: str, retries: int = 3, timeout: int = 20) -> Optional[str]:
     """
     GET simple para endpoints públicos de LinkedIn (jobs-guest y páginas de detalle).
-    Rota User-Agent y hace pequeños backoffs para reducir bloqueos.
+    Rota User-Agent; las esperas ante 429/403 las decide el limitador compartido.
     """
     for attempt in range(1, retries + 1):
         try:
@@ -69,17 +117,17 @@ def linkedin_fetch(url: str, retries: int = 3, timeout: int = 20) -> Optional[st
                 "User-Agent": random_user_agent(),
                 "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Connection": "keep-alive",
                 "Upgrade-Insecure-Requests": "1",
             }
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            if resp.status_code == 200 and resp.text:
+            resp = send("GET", url, headers=headers, timeout=timeout)
+            if resp is None:
+                return None  # circuito abierto: no insistir
+            if resp.status_code == 200:
+                # 200 sin cuerpo = listado agotado (no es una falla)
                 return resp.text
-            # 429 / 403 -> backoff aleatorio
-            if resp.status_code in (429, 403):
-                time.sleep(1.5 + random.random() * 2.5)
-            else:
+            # 429 / 403 -> el limitador ya bajó la tasa y respeta Retry-After
+            if resp.status_code not in (429, 403):
                 time.sleep(0.5 + random.random())
         except requests.RequestException:
             time.sleep(0.7 + random.random())
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,29 @@
+from typing import Sequence
+
+# Consultas sobre la colección de jobs compartidas por el export y la búsqueda.
+# Sin conexión propia: quien llama pasa la colección.
+
+_indexed = False
+
+
+def position_filter(positions: Sequence[str]) -> dict:
+    # positions (multikey) trae todas las posiciones; los documentos previos solo tienen position
+    wanted = list(positions)
+    return {"$or": [{"positions": {"$in": wanted}}, {"position": {"$in": wanted}}]}
+
+
+def ensure_indexes(collection):
+    """Índices de los filtros del export y de la búsqueda (una vez por proceso)."""
+    global _indexed
+    if _indexed:
+        return
+    # Índice invertido (multikey) con la fecha al lado: los candidatos salen ya ordenados
+    collection.create_index([("terms", 1), ("published_at", -1)])
+    # Sitio / posición / modalidad + rango de fechas
+    collection.create_index([("website", 1), ("published_at", -1)])
+    collection.create_index([("position", 1), ("published_at", -1)])
+    collection.create_index([("positions", 1), ("published_at", -1)])
+    collection.create_index([("modality", 1), ("published_at", -1)])
+    # "Desde el último export"
+    collection.create_index([("first_seen_at", 1)])
+    _indexed = True
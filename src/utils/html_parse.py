@@ -0,0 +1,101 @@
+import html as _html
+import importlib.util
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml (C) si está instalado; si no, el parser de la stdlib
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Subárboles que usamos de una página de detalle (guest y UI logueada)
+_DETAIL_CLASS_RE = re.compile(
+    r"(?:^|\s)(?:top-card-layout|topcard__|description__|show-more-less-html"
+    r"|job-details-jobs-unified-top-card|jobs-description|jobs-box__html-content)"
+)
+# Tarjetas de la lista guest
+_LIST_CLASS_RE = re.compile(r"(?:^|\s)(?:base-card|job-search-card)(?:\s|$)")
+
+_CANONICAL_RE = re.compile(r"<link\b[^>]*\brel=[\"']canonical[\"'][^>]*>", re.I)
+_HREF_RE = re.compile(r"\bhref=[\"']([^\"']+)[\"']", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_DROP_BLOCK_RE = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+_ANY_TAG_RE = re.compile(r"<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>")
+_EMPTY_TAG_RE = re.compile(r"<(p|li|strong|b|em|i|ul|ol)>\s*</\1>")
+_INLINE_SPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+_NEWLINES_RE = re.compile(r" ?\n[\s]*")
+# Lo único que se conserva de la descripción: estructura de texto, sin atributos
+_KEEP_TAGS = frozenset({"p", "br", "ul", "ol", "li", "strong", "b", "em", "i"})
+_BREAK_TAGS = frozenset({"div", "section", "h1", "h2", "h3", "h4", "h5", "h6", "tr"})
+
+
+def _class_matcher(pattern: re.Pattern):
+    def match(value) -> bool:
+        if not value:
+            return False
+        if not isinstance(value, str):
+            value = " ".join(value)
+        return pattern.search(value) is not None
+    return match
+
+
+DETAIL_STRAINER = SoupStrainer(attrs={"class": _class_matcher(_DETAIL_CLASS_RE)})
+LIST_STRAINER = SoupStrainer(attrs={"class": _class_matcher(_LIST_CLASS_RE)})
+
+
+def parse(html: str, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    return BeautifulSoup(html, PARSER, parse_only=strainer)
+
+
+def parse_detail(html: str) -> BeautifulSoup:
+    """
+    Parsea solo top card, criterios y descripción: el resto de la página
+    (nav, recomendados, scripts) ni siquiera se construye como árbol.
+    """
+    return parse(html, DETAIL_STRAINER)
+
+
+def parse_list(html: str) -> BeautifulSoup:
+    return parse(html, LIST_STRAINER)
+
+
+def canonical_url(html: str) -> Optional[str]:
+    # <link rel="canonical"> está en <head>, fuera de los subárboles parseados
+    tag = _CANONICAL_RE.search(html)
+    if not tag:
+        return None
+    href = _HREF_RE.search(tag.group(0))
+    return _html.unescape(href.group(1)) if href else None
+
+
+def plain_text(html: Optional[str]) -> str:
+    """
+    Texto plano de una descripción (LinkedIn la guarda como HTML). Sin árbol:
+    para indexar o comparar basta con sacar etiquetas y entidades.
+    """
+    if not html:
+        return ""
+    text = _html.unescape(_TAG_RE.sub(" ", html))
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def compact_html(html: Optional[str]) -> str:
+    """
+    Markup mínimo para guardar una descripción: solo p/br/listas/énfasis y sin atributos
+    (clases, estilos, data-*), scripts/comentarios fuera, espacios colapsados.
+    El texto plano pasa igual, con espacios normalizados.
+    """
+    if not html:
+        return ""
+
+    def tag(m: re.Match) -> str:
+        closing, name = m.group(1), m.group(2).lower()
+        if name in _KEEP_TAGS:
+            return "<br>" if name == "br" else f"<{closing}{name}>"
+        return "\n" if name in _BREAK_TAGS else " "
+
+    out = _ANY_TAG_RE.sub(tag, _DROP_BLOCK_RE.sub(" ", html))
+    out = _INLINE_SPACE_RE.sub(" ", out)
+    out = _EMPTY_TAG_RE.sub("", out)
+    return _NEWLINES_RE.sub("\n", out).strip()
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils import config
+
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+@dataclass
+class CachedResponse:
+    key: str
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag") or self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified") or self.headers.get("last-modified")
+
+    def to_response(self) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = self.status
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.body
+        resp.url = self.url
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        return resp
+
+
+class HttpCache:
+    """
+    Caché de respuestas en SQLite bajo fetch.send.
+    Clave = método + URL + cuerpo (Laborum busca por POST). TTL por sitio, expulsión LRU
+    por tamaño total y revalidación con ETag / Last-Modified cuando el sitio los manda.
+    Modos: "off", "on" y "replay" (nunca sale a la red; un miss devuelve None).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        mode: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = path or config.HTTP_CACHE_PATH
+        self.mode = (mode or config.HTTP_CACHE_MODE).lower()
+        self.max_bytes = max_bytes or config.HTTP_CACHE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("on", "replay")
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(method: str, url: str, body: Any = None) -> str:
+        raw = f"{method.upper()} {url}"
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        elif body is not None and not isinstance(body, str):
+            body = json.dumps(body, sort_keys=True, ensure_ascii=False)
+        if body:
+            raw += " " + body
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, site: str) -> int:
+        return config.HTTP_CACHE_TTLS.get(site, config.HTTP_CACHE_TTL)
+
+    def is_fresh(self, entry: CachedResponse, site: str) -> bool:
+        return time.time() - entry.stored_at < self.ttl_for(site)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        url, status, headers, body, stored_at = row
+        return CachedResponse(key, url, status, json.loads(headers), body, stored_at)
+
+    def put(self, key: str, site: str, resp: requests.Response):
+        body = resp.content
+        # El cuerpo ya viene descomprimido: se descartan las cabeceras de transporte
+        headers = json.dumps({k: v for k, v in resp.headers.items() if k.lower() not in _HOP_HEADERS})
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            total = self._size(db)
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, site, url, status, headers, body, stored_at, last_access, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, site, resp.url, resp.status_code, headers, body, now, now, len(body)),
+            )
+            self._total = total - (old[0] if old else 0) + len(body)
+            self._evict(db)
+            db.commit()
+
+    def refresh(self, key: str):
+        """El servidor respondió 304: la copia vuelve a estar fresca."""
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            db.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._total = None
+
+    def _size(self, db: sqlite3.Connection) -> int:
+        if self._total is None:
+            (self._total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return self._total
+
+    def _evict(self, db: sqlite3.Connection):
+        if self._total <= self.max_bytes:
+            return
+        # Se expulsa lo menos usado hasta quedar bajo ~90% del tope
+        target = int(self.max_bytes * 0.9)
+        rows = db.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        drop = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            drop.append((key,))
+            self._total -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", drop)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, site TEXT, url TEXT, status INTEGER, headers TEXT, body BLOB,"
+                "stored_at REAL, last_access REAL, size INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        return self._conn
+
+
+http_cache = HttpCache()
@@ -0,0 +1,77 @@
+import hashlib
+import random
+import re
+from array import array
+from typing import Iterable, List, Optional, Set
+
+from utils.html_parse import plain_text
+from utils.rules import fold
+
+_MERSENNE = (1 << 61) - 1
+_MAX32 = (1 << 32) - 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_ITEM = array("I").itemsize
+
+
+def shingles(text: str, k: int = 3) -> Set[str]:
+    """k-gramas de palabras sobre texto normalizado (minúsculas, sin tildes ni puntuación)."""
+    words = _WORD_RE.findall(fold(text))
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def job_shingles(title: Optional[str], company: Optional[str], description: Optional[str]) -> Set[str]:
+    return shingles(f"{title or ''} {company or ''} {plain_text(description)}")
+
+
+class MinHasher:
+    """
+    Firmas MinHash de `num_perm` valores de 32 bits y bandas LSH (`bands` x rows).
+    Las permutaciones salen de una semilla fija: las firmas guardadas siguen
+    siendo comparables entre corridas mientras no cambien num_perm / seed.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rnd = random.Random(seed)
+        self._perms = [(rnd.randrange(1, _MERSENNE), rnd.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+
+    def signature(self, tokens: Iterable[str]) -> Optional[bytes]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little")
+            for t in tokens
+        ]
+        if not hashes:
+            return None
+        sig = array("I", (
+            min(((a * h + b) % _MERSENNE) & _MAX32 for h in hashes)
+            for a, b in self._perms
+        ))
+        return sig.tobytes()
+
+    def band_keys(self, signature: bytes) -> List[str]:
+        """Una clave por banda: "<banda>:<hash de sus filas>". Dos firmas comparten clave => candidatas."""
+        width = self.rows * _ITEM
+        return [
+            f"{i}:{hashlib.blake2b(signature[i * width:(i + 1) * width], digest_size=8).hexdigest()}"
+            for i in range(self.bands)
+        ]
+
+    def valid(self, signature: Optional[bytes]) -> bool:
+        """Firma calculada con estos mismos parámetros (si cambia num_perm hay que recalcular)."""
+        return signature is not None and len(signature) == self.num_perm * _ITEM
+
+    @staticmethod
+    def similarity(a: bytes, b: bytes) -> float:
+        """Jaccard estimado: fracción de posiciones iguales entre dos firmas."""
+        sa, sb = array("I"), array("I")
+        sa.frombytes(a)
+        sb.frombytes(b)
+        if len(sa) != len(sb) or not sa:
+            return 0.0
+        return sum(x == y for x, y in zip(sa, sb)) / len(sa)
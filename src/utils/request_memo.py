@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils import config
+from utils.http_cache import HttpCache
+
+
+class RequestMemo:
+    """
+    Single-flight de la corrida: si dos tareas piden el mismo método + URL + body
+    mientras el primero sigue en vuelo, solo ese sale a la red y los demás esperan su
+    resultado (sin ocupar cupo del sitio). Apenas se resuelve la entrada se suelta: no se
+    retienen respuestas (los repetidos posteriores los sirve http_cache), así que la
+    memoria depende de lo que está en vuelo y no del tamaño del crawl.
+    Sirve para cualquier event loop (cada spider corre el suyo).
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = config.REQUEST_MEMO if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Future] = {}
+        self.hits = 0
+
+    key = staticmethod(HttpCache.key)
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._entries.get(key)
+            if fut is not None:
+                self.hits += 1
+                return fut, False
+            fut = self._entries[key] = Future()
+            return fut, True
+
+    def _forget(self, key: str, fut: Future):
+        with self._lock:
+            if self._entries.get(key) is fut:
+                del self._entries[key]
+
+    async def call(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fetch()
+        while True:
+            fut, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                # shield: cancelar a quien espera no cancela el pedido compartido
+                return await asyncio.shield(asyncio.wrap_future(fut))
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise
+                # Se canceló el que pedía (p. ej. por plazo), no este: se vuelve a intentar
+
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._forget(key, fut)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self.hits = 0
+
+
+request_memo = RequestMemo()
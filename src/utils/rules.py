@@ -0,0 +1,132 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple, TypeVar
+
+from utils.enums import JobType, Modality, Position
+
+T = TypeVar("T")
+
+# Minúsculas sin tildes: "Práctica Híbrida" -> "practica hibrida"
+_FOLD = str.maketrans("áéíóúàèìòùäëïöüâêîôûñç", "aeiouaeiouaeiouaeiounc")
+
+
+def fold(text: Optional[str]) -> str:
+    return (text or "").lower().translate(_FOLD)
+
+
+class _Matcher:
+    """
+    Una regex combinada (un grupo por etiqueta) sobre texto ya normalizado.
+    Las etiquetas van en orden de prioridad: si aparecen varias gana la primera.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[T, Sequence[str]]], word_bounded: bool = True):
+        self._labels: Dict[str, Tuple[int, T]] = {}
+        parts = []
+        for i, (label, keywords) in enumerate(rules):
+            group = f"g{i}"
+            self._labels[group] = (i, label)
+            alternatives = "|".join(re.escape(k).replace(r"\ ", r"[\s_-]+") for k in keywords)
+            parts.append(f"(?P<{group}>{alternatives})")
+        body = "|".join(parts)
+        self._re: Pattern[str] = re.compile(rf"\b(?:{body})\b" if word_bounded else body)
+
+    def first(self, folded: str) -> Optional[T]:
+        best: Optional[Tuple[int, T]] = None
+        for m in self._re.finditer(folded):
+            hit = self._labels[m.lastgroup]
+            if best is None or hit[0] < best[0]:
+                best = hit
+                if best[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+_PRACTICE = _Matcher([(True, ("practica", "practicas", "practicante"))])
+
+# Sin \b: también cuenta "remote-first", "hibrida", etc. (igual que el `in` de antes)
+_MODALITY = _Matcher(
+    [
+        (Modality.REMOTO, ("remoto", "remota", "remote")),
+        (Modality.HIBRIDO, ("hibrido", "hibrida", "hybrid")),
+    ],
+    word_bounded=False,
+)
+
+_JOB_TYPE = _Matcher([
+    (JobType.PARTTIME, ("part time", "parttime", "media jornada", "medio tiempo", "jornada parcial", "voluntario", "volunteer")),
+    (JobType.FULLTIME, ("full time", "fulltime", "jornada completa", "tiempo completo")),
+])
+
+_POSITION = _Matcher([
+    (Position.FULLSTACK, ("fullstack", "full stack")),
+    (Position.BACKEND, ("backend", "back end")),
+    (Position.FRONTEND, ("frontend", "front end")),
+    (Position.MOBILE, ("mobile", "movil", "android", "ios", "flutter", "react native")),
+    (Position.DEVOPS, ("devops", "sre", "site reliability", "cloud engineer")),
+    (Position.DATA, ("data", "datos", "data engineer", "data scientist", "business intelligence")),
+    (Position.QA, ("qa", "tester", "testing", "quality assurance", "aseguramiento de calidad")),
+    (Position.PRODUCT_MANAGER, ("product manager", "product owner", "gerente de producto")),
+    (Position.DESIGNER, ("disenador", "disenadora", "designer", "ux", "ui")),
+])
+
+
+@dataclass(frozen=True)
+class Labels:
+    is_practice: bool
+    modality: Optional[Modality]
+    type_: Optional[JobType]
+    position: Optional[Position]
+
+
+def is_practice(title: Optional[str]) -> bool:
+    return _PRACTICE.first(fold(title)) is not None
+
+
+def modality(text: Optional[str]) -> Optional[Modality]:
+    return _MODALITY.first(fold(text))
+
+
+def job_type(text: Optional[str]) -> Optional[JobType]:
+    return _JOB_TYPE.first(fold(text))
+
+
+def position(title: Optional[str]) -> Optional[Position]:
+    return _POSITION.first(fold(title))
+
+
+def classify(title: Optional[str], text: Optional[str] = None) -> Labels:
+    """
+    Práctica y cargo salen del título; modalidad y jornada del título + `text`
+    (ubicación, criterios, descripción...). None = no se pudo inferir.
+    """
+    t = fold(title)
+    body = f"{t} {fold(text)}" if text else t
+    return Labels(
+        is_practice=_PRACTICE.first(t) is not None,
+        modality=_MODALITY.first(body),
+        type_=_JOB_TYPE.first(body),
+        position=_POSITION.first(t),
+    )
+
+
+def classify_many(items: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[Labels]:
+    """
+    Lote de (título, texto) -> Labels, en el mismo orden. En un lote los títulos se
+    repiten mucho: práctica y cargo se calculan una sola vez por título.
+    """
+    by_title: Dict[str, Tuple[bool, Optional[Position]]] = {}
+    labels = []
+    for title, text in items:
+        t = fold(title)
+        from_title = by_title.get(t)
+        if from_title is None:
+            from_title = by_title[t] = (_PRACTICE.first(t) is not None, _POSITION.first(t))
+        body = f"{t} {fold(text)}" if text else t
+        labels.append(Labels(
+            is_practice=from_title[0],
+            modality=_MODALITY.first(body),
+            type_=_JOB_TYPE.first(body),
+            position=from_title[1],
+        ))
+    return labels
@@ -0,0 +1,123 @@
+import hashlib
+import math
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from utils import config
+from utils.enums import Website
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simple (doble hashing sobre blake2b). Sin falsos negativos:
+    si dice que no está, no está.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenIndex:
+    """
+    Índice persistente (SQLite) de ofertas ya guardadas por sitio, con un Bloom en memoria
+    delante: la gran mayoría de las consultas por ofertas nuevas no toca el disco.
+    Igual que crawl_state, lo visto en la corrida se persiste recién en commit().
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or config.SEEN_INDEX_PATH
+        self.enabled = config.SKIP_SEEN_OFFERS if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._blooms: Dict[str, BloomFilter] = {}
+        self._pending: Set[Tuple[str, str]] = set()
+
+    def contains(self, site: Website, offer_id: Optional[str]) -> bool:
+        if not self.enabled or not offer_id:
+            return False
+        with self._lock:
+            if offer_id not in self._bloom(site.value):
+                return False
+            row = self._db().execute(
+                "SELECT 1 FROM seen WHERE site = ? AND offer_id = ?", (site.value, offer_id)
+            ).fetchone()
+            return row is not None
+
+    def add(self, site: Website, offer_id: Optional[str]):
+        if offer_id:
+            with self._lock:
+                self._pending.add((site.value, offer_id))
+
+    def track(self, jobs: Iterable) -> Iterator:
+        for job in jobs:
+            # Un job con campos pendientes se vuelve a ofrecer al detalle en la próxima corrida
+            if job.hydrated:
+                self.add(job.website, job.source_id)
+            yield job
+
+    def commit(self):
+        with self._lock:
+            if not self._pending:
+                return
+            db = self._db()
+            db.executemany("INSERT OR IGNORE INTO seen (site, offer_id) VALUES (?, ?)", self._pending)
+            db.commit()
+            for site, offer_id in self._pending:
+                bloom = self._blooms.get(site)
+                if bloom is not None:
+                    bloom.add(offer_id)
+            self._pending.clear()
+
+    def rollback(self):
+        with self._lock:
+            self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._blooms.clear()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                "site TEXT NOT NULL, offer_id TEXT NOT NULL, PRIMARY KEY (site, offer_id)"
+                ") WITHOUT ROWID"
+            )
+        return self._conn
+
+    def _bloom(self, site: str) -> BloomFilter:
+        bloom = self._blooms.get(site)
+        if bloom is None:
+            db = self._db()
+            (count,) = db.execute("SELECT COUNT(*) FROM seen WHERE site = ?", (site,)).fetchone()
+            # Holgura para lo que se agregue durante la corrida sin degradar la tasa de error
+            bloom = BloomFilter(capacity=max(10_000, count * 2))
+            for (offer_id,) in db.execute("SELECT offer_id FROM seen WHERE site = ?", (site,)):
+                bloom.add(offer_id)
+            self._blooms[site] = bloom
+        return bloom
+
+
+seen_index = SeenIndex()
@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional, Sequence
+
+from utils import config
+
+
+class SelectorCache:
+    """
+    Recuerda, por grupo (p. ej. "linkedin.cards"), qué variante de selector funcionó
+    con el layout actual, y la prueba primero la próxima vez. Si deja de matchear se
+    descarta y se vuelve a buscar entre todas. Persistido en un JSON entre corridas.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SELECTOR_CACHE_PATH
+        self._lock = threading.Lock()
+        self._chosen: Dict[str, str] = {}
+        self._load()
+
+    def get(self, group: str) -> Optional[str]:
+        with self._lock:
+            return self._chosen.get(group)
+
+    def resolve(self, group: str, variants: Sequence[str], matches: Callable[[str], bool]) -> Optional[str]:
+        """
+        Devuelve la primera variante para la que matches(selector) es True, empezando
+        por la recordada. None si ninguna matchea (lo recordado se mantiene: puede ser
+        que la página simplemente no tenga ese elemento ahora).
+        """
+        cached = self.get(group)
+        if cached in variants and matches(cached):
+            return cached
+        for sel in variants:
+            if sel != cached and matches(sel):
+                self._set(group, sel)
+                return sel
+        return None
+
+    def _set(self, group: str, selector: str):
+        with self._lock:
+            if self._chosen.get(group) != selector:
+                self._chosen[group] = selector
+                self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        self._chosen = {k: v for k, v in raw.items() if isinstance(v, str)}
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._chosen, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error saving selector cache: {e}")
+
+
+selector_cache = SelectorCache()
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils import config
+
+
+def site_for(url: str) -> str:
+    """
+    Agrupa subdominios del mismo sitio (cl.linkedin.com / www.linkedin.com -> linkedin.com).
+    """
+    host = (urlparse(url).hostname or "").lower()
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+class SessionManager:
+    """
+    Un requests.Session por sitio, con pool keep-alive y reintentos a nivel de conexión.
+    Los 4xx (429/403 de LinkedIn) no se reintentan aquí: los maneja cada helper.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ):
+        self.pool_size = pool_size or config.HTTP_POOL_SIZE
+        self.retries = config.HTTP_RETRIES if retries is None else retries
+        self.backoff = config.HTTP_BACKOFF if backoff is None else backoff
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> requests.Session:
+        site = site_for(url)
+        session = self._sessions.get(site)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(site)
+            if session is None:
+                session = self._sessions[site] = self._build(site)
+            return session
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+    def _build(self, site: str) -> requests.Session:
+        pool = config.LINKEDIN_HTTP_POOL_SIZE if site == "linkedin.com" else self.pool_size
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,  # los timeouts de lectura los decide cada helper
+            status=self.retries,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            backoff_factor=self.backoff,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool), max_retries=retry)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+
+sessions = SessionManager()
+
+
+def get_session(url: str) -> requests.Session:
+    return sessions.get(url)
+
+
+def close_sessions():
+    sessions.close()
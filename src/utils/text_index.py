@@ -0,0 +1,77 @@
+import re
+from typing import List, Optional, Set
+
+from utils.html_parse import plain_text
+from utils.rules import fold
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Palabras vacías (ya sin tildes); no aportan nada al buscar
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aquel aqui asi aun cada como con contra cual
+cuales cuando de del desde donde dos durante e el ella ellas ellos en entre era es esa esas ese eso esos
+esta estan estar estas este esto estos etc fue ha hace hacia han hasta hay la las le les lo los mas me
+mi mismo mucho muy ni no nos nosotros o otra otras otro otros para pero poco por porque que quien
+se sea segun ser si sin sobre solo son su sus tambien tan te tener tiene tienen todo todos tu tus un
+una unas uno unos usted y ya
+the and or of to for in on with at by an is are be as
+""".split())
+
+# Orden de prueba: el sufijo más largo primero
+_PLURAL_SUFFIXES = (("ces", "z"), ("es", ""), ("s", ""))
+_VOWELS = set("aeiou")
+# "-es" de plural solo tras estas consonantes (desarrollador-es, red-es); "clases" -> "clase"
+_ES_AFTER = set("lrndjy")
+
+
+def stem(word: str) -> str:
+    """
+    Stemming mínimo de plurales en español ("desarrolladores" -> "desarrollador",
+    "luces" -> "luz", "ingenieros" -> "ingeniero"). Se aplica igual al indexar y al buscar,
+    así que basta con que sea consistente.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, repl in _PLURAL_SUFFIXES:
+        if word.endswith(suffix):
+            base = word[: -len(suffix)]
+            # "-s" solo tras vocal (ingeniero-s)
+            if suffix == "es" and (len(base) < 3 or base[-1] not in _ES_AFTER):
+                continue
+            if suffix == "s" and base[-1] not in _VOWELS:
+                continue
+            return base + repl
+    return word
+
+
+def terms(text: Optional[str]) -> List[str]:
+    """Términos del texto en orden de aparición (con repetidos)."""
+    return [stem(w) for w in _WORD_RE.findall(fold(text)) if w not in STOPWORDS and len(w) > 1]
+
+
+def term_set(*texts: Optional[str]) -> Set[str]:
+    out: Set[str] = set()
+    for text in texts:
+        out.update(terms(text))
+    return out
+
+
+def document_terms(doc: dict, max_terms: int = 400) -> dict:
+    """
+    Campos del índice invertido para un documento de Job: title_terms (título) y
+    terms (título + empresa + ubicación + descripción en texto plano).
+    """
+    title = term_set(doc.get("title"))
+    # En orden de aparición: si hay que recortar se pierde la cola del texto, no las
+    # palabras que caen al final del alfabeto
+    body: List[str] = []
+    for text in (doc.get("company"), doc.get("location"), plain_text(doc.get("description"))):
+        body.extend(terms(text))
+    body = [t for t in dict.fromkeys(body) if t not in title]
+    # Descripciones enormes: se priorizan los términos del título
+    kept = body[: max(0, max_terms - len(title))]
+    return {"title_terms": sorted(title), "terms": sorted(title.union(kept))}
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(terms(query)))
@@ -0,0 +1,71 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Generic, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class ThreadedQueue(Generic[T]):
+    """
+    Cola acotada entre uno o más hilos productores y un único consumidor.
+    Si el consumidor se atrasa, los productores esperan; si se va (close()), put()
+    devuelve False y cada productor debe cortar. Los errores de un productor se
+    re-lanzan en el consumidor.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self._stop = threading.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    def put(self, item: T) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @contextmanager
+    def producer(self):
+        """Envuelve el cuerpo de un productor: publica su error (si hubo) y su fin."""
+        try:
+            yield self
+        except BaseException as e:
+            self.put(_Failure(e))
+        finally:
+            self.put(_DONE)
+
+    def drain(self, producers: int = 1, tick: Optional[float] = None) -> Iterator[Optional[T]]:
+        """
+        Entrega los items hasta que terminen los `producers`. Con `tick`, entrega None
+        cada `tick` segundos sin novedades.
+        """
+        finished = 0
+        while finished < producers:
+            try:
+                item = self._queue.get(timeout=tick)
+            except queue.Empty:
+                yield None
+                continue
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, _Failure):
+                raise item.exc
+            else:
+                yield item
+
+    def close(self):
+        self._stop.set()
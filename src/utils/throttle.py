@@ -0,0 +1,125 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Set
+
+from utils import config
+
+# Respuestas que significan "nos están frenando"
+BLOCK_STATUSES = frozenset({429, 403})
+
+
+class CircuitOpenError(Exception):
+    """El sitio nos bloqueó: no se hacen más peticiones en esta ejecución."""
+
+
+@dataclass
+class _HostState:
+    rate: float                 # peticiones por segundo permitidas
+    next_slot: float = 0.0      # monotonic del próximo turno libre
+    blocked_until: float = 0.0  # monotonic hasta el que se respeta Retry-After
+    strikes: int = 0            # bloqueos consecutivos
+    open: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class HostThrottle:
+    """
+    Limitador AIMD por sitio: sube la tasa en +increase tras cada éxito, la multiplica
+    por decrease ante 429/403 y respeta Retry-After. Tras `threshold` bloqueos seguidos
+    abre el circuito y el resto de la ejecución falla al instante para ese sitio.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase: Optional[float] = None,
+        decrease: Optional[float] = None,
+        threshold: Optional[int] = None,
+    ):
+        self.rate = rate or config.THROTTLE_RATE
+        self.min_rate = min_rate or config.THROTTLE_MIN_RATE
+        self.max_rate = max_rate or config.THROTTLE_MAX_RATE
+        self.increase = config.THROTTLE_INCREASE if increase is None else increase
+        self.decrease = decrease or config.THROTTLE_DECREASE
+        self.threshold = threshold or config.BREAKER_THRESHOLD
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, site: str):
+        """
+        Bloquea hasta que haya turno para `site`. Lanza CircuitOpenError si el circuito está abierto.
+        """
+        state = self._state(site)
+        with state.lock:
+            if state.open:
+                raise CircuitOpenError(site)
+            now = time.monotonic()
+            start = max(now, state.next_slot, state.blocked_until)
+            state.next_slot = start + 1.0 / state.rate
+        if start > now:
+            time.sleep(start - now)
+        if state.open:
+            raise CircuitOpenError(site)
+
+    def record(self, site: str, status: int, retry_after: Optional[str] = None):
+        state = self._state(site)
+        with state.lock:
+            if status in BLOCK_STATUSES:
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                state.strikes += 1
+                wait = parse_retry_after(retry_after)
+                if wait:
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + wait)
+                # Un Retry-After muy largo equivale a un bloqueo para toda la ejecución
+                blocked = state.strikes >= self.threshold or wait > config.BREAKER_MAX_WAIT
+                if blocked and not state.open:
+                    state.open = True
+                    print(f"Circuit open for {site}: {state.strikes} blocked responses in a row")
+            elif status < 400:
+                state.rate = min(self.max_rate, state.rate + self.increase)
+                state.strikes = 0
+
+    def is_open(self, site: str) -> bool:
+        return self._state(site).open
+
+    def open_sites(self) -> Set[str]:
+        with self._lock:
+            return {site for site, state in self._hosts.items() if state.open}
+
+    def reset(self):
+        with self._lock:
+            self._hosts = {}
+
+    def _state(self, site: str) -> _HostState:
+        state = self._hosts.get(site)
+        if state is not None:
+            return state
+        with self._lock:
+            state = self._hosts.get(site)
+            if state is None:
+                rate = config.LINKEDIN_THROTTLE_RATE if site == "linkedin.com" else self.rate
+                state = self._hosts[site] = _HostState(rate=rate)
+            return state
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+throttle = HostThrottle()